@@ -0,0 +1,94 @@
+"""Per-request overhead of SatispayAuth outside the RSA operation.
+
+The key is replaced by a stand-in whose sign() returns immediately, so the timings
+only cover date formatting, body digest, signing string and header composition.
+The previous implementation is kept here as a reference point.
+
+    python benchmarks/auth_overhead.py --number 20000
+"""
+import argparse
+import timeit
+from base64 import b64encode
+from datetime import datetime, timezone
+from hashlib import sha256
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+
+from satispaython import SatispayAuth
+
+
+class NullKey:
+
+    def sign(self, data, padding, algorithm):
+        return bytes(512)
+
+
+class LegacySatispayAuth(SatispayAuth):
+
+    @staticmethod
+    def _get_formatted_date():
+        date = datetime.now(timezone.utc)
+        return date.strftime('%a, %d %b %Y %H:%M:%S %z')
+
+    @staticmethod
+    def _compute_digest(request):
+        digest = sha256(request.content).digest()
+        digest = b64encode(digest).decode()
+        return f'SHA-256={digest}'
+
+    @staticmethod
+    def _compose_string(request, date, digest):
+        method, target, host = request.method, request.url.path, request.url.host
+        return f'(request-target): {method.lower()} {target}\nhost: {host}\ndate: {date}\ndigest: {digest}'
+
+    def _generate_authorization_headers(self, request):
+        date = self._get_formatted_date()
+        digest = self._compute_digest(request)
+        string = self._compose_string(request, date, digest)
+        signature = self._sign_string(string)
+        authorization_header = self._compose_authorization_header(signature)
+        headers = {'Host': request.url.host, 'Date': date, 'Digest': digest, 'Authorization': authorization_header}
+        return httpx.Headers(headers)
+
+    def auth_flow(self, request):
+        request.headers.update(self._generate_authorization_headers(request))
+        yield request
+
+    def _sign_string(self, string):
+        signature = self._rsa_key.sign(string.encode(), None, None)
+        return b64encode(signature).decode()
+
+    def _compose_authorization_header(self, signature):
+        return f'Signature keyId="{self._key_id}", ' \
+               f'algorithm="rsa-sha256", ' \
+               f'headers="(request-target) host date digest", ' \
+               f'signature="{signature}"'
+
+
+def _requests():
+    url = 'https://authservices.satispay.com/g_business/v1/payments'
+    yield 'GET', httpx.Request('GET', f'{url}/2936affa-ab4c-4daa-9bec-7cafbce4caa1')
+    yield 'POST', httpx.Request('POST', url, json={'flow': 'MATCH_CODE', 'amount_unit': 100, 'currency': 'EUR'})
+
+
+def _time(auth, request, number):
+    seconds = min(timeit.repeat(lambda: auth.auth_flow(request).send(None), number=number, repeat=5))
+    return seconds / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+    rsa_key = generate_private_key(65537, 4096)
+    for method, request in _requests():
+        legacy = _time(LegacySatispayAuth('key_id', NullKey()), request, args.number)
+        current = _time(SatispayAuth('key_id', NullKey()), request, args.number)
+        signed = _time(SatispayAuth('key_id', rsa_key), request, max(1, args.number // 200))
+        print(f'{method:<5} overhead legacy {legacy:>7.2f} us   current {current:>7.2f} us   '
+              f'full request signing {signed:>9.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Throughput of SatispayClient.map against a serial loop.
+
+A stand-in server runs in a background thread and answers every request after
+--latency seconds. The same get_payment_details calls are made one after
+another and through SatispayClient.map with an increasing number of worker
+threads, sharing one connection pool. RSA signing releases the GIL, so with
+--latency 0 the speed-up shows how far signing scales across cores.
+
+    python benchmarks/client_map.py --requests 500 --workers 1 4 16 --latency 0.02
+"""
+import argparse
+import os
+import time
+
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from httpx import Limits
+
+from satispaython import SatispayClient
+from satispaython.standin import StandInSatispay
+
+
+def _serial(client, payment_ids):
+    for payment_id in payment_ids:
+        client.get_payment_details(payment_id).raise_for_status()
+
+
+def _mapped(client, payment_ids, workers, ordered):
+    for result in client.map(client.get_payment_details, payment_ids, concurrency=workers, ordered=ordered):
+        if result.error is not None:
+            raise result.error
+        result.response.raise_for_status()
+
+
+def _measure(func, requests):
+    start = time.perf_counter()
+    func()
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--key-size', type=int, default=4096)
+    parser.add_argument('--ordered', action='store_true')
+    args = parser.parse_args()
+    rsa_key = generate_private_key(65537, args.key_size)
+    standin = StandInSatispay(latency=args.latency)
+    standin.register_key('bench', rsa_key.public_key())
+    limits = Limits(max_connections=max(args.workers), max_keepalive_connections=max(args.workers))
+    with standin.serve() as server:
+        with SatispayClient('bench', rsa_key, base_url=server.url, limits=limits) as client:
+            payment_id = client.create_payment(100, 'EUR').json()['id']
+            payment_ids = [payment_id] * args.requests
+            print(f'{os.cpu_count()} CPUs, rsa{args.key_size}, {args.latency * 1000:.0f} ms latency')
+            serial = _measure(lambda: _serial(client, payment_ids), args.requests)
+            print(f'{"serial":<12} {serial:>8.1f} req/s')
+            for workers in args.workers:
+                mapped = _measure(lambda: _mapped(client, payment_ids, workers, args.ordered), args.requests)
+                print(f'{f"map({workers})":<12} {mapped:>8.1f} req/s   x{mapped / serial:.2f}')
+
+
+if __name__ == '__main__':
+    main()
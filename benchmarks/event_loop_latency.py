@@ -0,0 +1,85 @@
+"""Event-loop latency of AsyncSatispayClient while signing under load.
+
+A ticker coroutine sleeps for 1 ms in a loop and records how late it wakes up,
+while N concurrent create_payment calls go through an in-process mock transport.
+The same load is run with signing inline on the loop and with signing offloaded.
+
+    python benchmarks/event_loop_latency.py --requests 500 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+
+from satispaython import AsyncSatispayClient, SatispayAuth
+
+
+class InlineSatispayAuth(SatispayAuth):
+    async_auth_flow = httpx.Auth.async_auth_flow
+
+
+def _handler(request):
+    return httpx.Response(200, json={'id': 'payment', 'status': 'PENDING'})
+
+
+async def _ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def _run(rsa_key, requests, concurrency, executor=None, inline=False):
+    transport = httpx.MockTransport(_handler)
+    semaphore = asyncio.Semaphore(concurrency)
+    lags, stop = [], asyncio.Event()
+    async with AsyncSatispayClient('key_id', rsa_key, executor=executor, transport=transport) as client:
+        if inline:
+            client.auth = InlineSatispayAuth('key_id', rsa_key)
+
+        async def create():
+            async with semaphore:
+                await client.create_payment(100, 'EUR')
+
+        ticker = asyncio.ensure_future(_ticker(lags, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(create() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await ticker
+    return elapsed, lags
+
+
+def _report(name, requests, elapsed, lags):
+    lags = sorted(lags) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f'{name:<10} {requests / elapsed:>10.1f} req/s   '
+          f'loop lag p50 {statistics.median(lags) * 1000:>8.2f} ms   '
+          f'p99 {p99 * 1000:>8.2f} ms   max {lags[-1] * 1000:>8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--key-size', type=int, default=4096)
+    args = parser.parse_args()
+    rsa_key = generate_private_key(65537, args.key_size)
+    loop = asyncio.get_event_loop()
+    result = loop.run_until_complete(_run(rsa_key, args.requests, args.concurrency, inline=True))
+    _report('inline', args.requests, *result)
+    with ThreadPoolExecutor(args.workers) as executor:
+        result = loop.run_until_complete(_run(rsa_key, args.requests, args.concurrency, executor))
+    _report('threads', args.requests, *result)
+    with ProcessPoolExecutor(args.workers) as executor:
+        result = loop.run_until_complete(_run(rsa_key, args.requests, args.concurrency, executor))
+    _report('processes', args.requests, *result)
+
+
+if __name__ == '__main__':
+    main()
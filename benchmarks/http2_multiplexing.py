@@ -0,0 +1,189 @@
+"""Sockets and throughput of AsyncSatispayClient over HTTP/1.1 and HTTP/2.
+
+A local TLS stand-in server negotiates h2 or http/1.1 through ALPN and answers
+every request after a fixed delay. The same concurrent load of get_payment_details
+calls is run with http2=False and http2=True, counting the new connections through
+a metrics hook. Requires satispaython[http2].
+
+    python benchmarks/http2_multiplexing.py --requests 2000 --concurrency 200 --delay 0.02
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import ssl
+import tempfile
+import time
+from pathlib import Path
+
+import h2.config
+import h2.connection
+import h2.events
+import h11
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from cryptography.x509.oid import NameOID
+
+from satispaython import AsyncSatispayClient
+from satispaython.metrics import MetricsHook
+
+BODY = json.dumps({'id': 'payment_id', 'status': 'PENDING'}).encode()
+RESPONSE_HEADERS = [('content-type', 'application/json'), ('content-length', str(len(BODY)))]
+
+
+class ConnectionCounter(MetricsHook):
+
+    def __init__(self):
+        self.connections = 0
+
+    def on_request(self, timings):
+        if timings.connect is not None:
+            self.connections += 1
+
+
+def _write_certificate(directory):
+    key = generate_private_key(65537, 2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName('localhost'), x509.IPAddress(ipaddress.ip_address('127.0.0.1'))]),
+            critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = Path(directory) / 'cert.pem', Path(directory) / 'key.pem'
+    cert_path.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return cert_path, key_path
+
+
+class StandInServer:
+
+    def __init__(self, cert_path, key_path, delay):
+        self.delay = delay
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(cert_path, key_path)
+        self.context.set_alpn_protocols(['h2', 'http/1.1'])
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0, ssl=self.context)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            if writer.get_extra_info('ssl_object').selected_alpn_protocol() == 'h2':
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_h11(reader, writer)
+        except (ConnectionError, h11.RemoteProtocolError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h11(self, reader, writer):
+        connection = h11.Connection(h11.SERVER)
+        while True:
+            event = connection.next_event()
+            if event is h11.NEED_DATA:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                connection.receive_data(data)
+            elif isinstance(event, h11.EndOfMessage):
+                await asyncio.sleep(self.delay)
+                writer.write(connection.send(h11.Response(status_code=200, headers=RESPONSE_HEADERS)))
+                writer.write(connection.send(h11.Data(data=BODY)))
+                writer.write(connection.send(h11.EndOfMessage()))
+                await writer.drain()
+                connection.start_next_cycle()
+            elif isinstance(event, h11.ConnectionClosed):
+                return
+
+    async def _serve_h2(self, reader, writer):
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        tasks = set()
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.StreamEnded):
+                    tasks.add(asyncio.ensure_future(self._respond_h2(connection, writer, event.stream_id)))
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(connection.data_to_send())
+            await writer.drain()
+        for task in tasks:
+            task.cancel()
+
+    async def _respond_h2(self, connection, writer, stream_id):
+        await asyncio.sleep(self.delay)
+        connection.send_headers(stream_id, [(':status', '200')] + RESPONSE_HEADERS)
+        connection.send_data(stream_id, BODY, end_stream=True)
+        writer.write(connection.data_to_send())
+
+
+async def _run(rsa_key, base_url, cafile, http2, requests, concurrency):
+    counter = ConnectionCounter()
+    semaphore = asyncio.Semaphore(concurrency)
+    versions = set()
+    async with AsyncSatispayClient('key_id', rsa_key, http2=http2, metrics=counter, verify=str(cafile)) as client:
+        client.base_url = base_url
+
+        async def get():
+            async with semaphore:
+                response = await client.get_payment_details('payment_id')
+                versions.add(response.http_version)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(get() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    return elapsed, counter.connections, versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.02)
+    parser.add_argument('--key-size', type=int, default=2048)
+    args = parser.parse_args()
+    rsa_key = generate_private_key(65537, args.key_size)
+    loop = asyncio.get_event_loop()
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = _write_certificate(directory)
+        server = StandInServer(cert_path, key_path, args.delay)
+        port = loop.run_until_complete(server.start())
+        base_url = f'https://localhost:{port}'
+        try:
+            for http2 in (False, True):
+                elapsed, connections, versions = loop.run_until_complete(
+                    _run(rsa_key, base_url, cert_path, http2, args.requests, args.concurrency)
+                )
+                print(f'{"/".join(sorted(versions)):<10} {args.requests / elapsed:>10.1f} req/s   '
+                      f'{connections:>5} connections')
+        finally:
+            loop.run_until_complete(server.close())
+
+
+if __name__ == '__main__':
+    main()
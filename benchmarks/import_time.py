@@ -0,0 +1,69 @@
+"""Cold import time of satispaython, measured with python -X importtime.
+
+Each statement is run --rounds times in a fresh interpreter and the median
+time spent importing the modules it loads on top of interpreter startup is
+reported, together with the slowest of those modules. With --max-ms, exits
+with status 1 when a median is above the threshold, so it can guard CI against
+eager imports creeping back into the package namespace.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --rounds 20 --max-ms 20
+    python benchmarks/import_time.py --statement "from satispaython import SatispayClient"
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    'import satispaython',
+    'import satispaython.utils',
+]
+
+
+def _importtime(statement):
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], check=True, stderr=subprocess.PIPE
+    ).stderr.decode()
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            top_level = not name[1:].startswith(' ')
+            modules[name.strip()] = (int(cumulative), top_level)
+    return modules
+
+
+def _measure(statement, rounds, startup):
+    totals, modules = [], {}
+    for _ in range(rounds):
+        modules = {name: value for name, value in _importtime(statement).items() if name not in startup}
+        totals.append(sum(time for time, top_level in modules.values() if top_level))
+    slowest = sorted(((name, time) for name, (time, _) in modules.items()), key=lambda item: item[1], reverse=True)
+    return statistics.median(totals) / 1000, len(modules), slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statement', action='append', help='statement to time (default: the package imports)')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--top', type=int, default=5, help='number of slowest modules to show')
+    parser.add_argument('--max-ms', type=float, help='fail when a median import time is above this')
+    args = parser.parse_args()
+    startup = set(_importtime('pass'))
+    failed = False
+    for statement in args.statement or STATEMENTS:
+        median, count, slowest = _measure(statement, args.rounds, startup)
+        over = args.max_ms is not None and median > args.max_ms
+        failed = failed or over
+        warning = '   SLOWER THAN --max-ms' if over else ''
+        print(f'{statement:<45} {median:>8.1f} ms   {count:>4} new modules{warning}')
+        for name, time in slowest[:args.top]:
+            print(f'    {name:<41} {time / 1000:>8.1f} ms')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
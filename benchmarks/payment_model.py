@@ -0,0 +1,77 @@
+"""Memory use and parse time of Payment against plain dicts.
+
+N payment bodies are decoded into dicts with response.json()-style json.loads,
+wrapped in lazy Payment objects, and wrapped in Payment objects whose status is
+read (which unpacks them). Memory is the tracemalloc peak of keeping all the
+results alive, not counting the raw bodies themselves.
+
+    python benchmarks/payment_model.py --payments 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+import uuid
+
+from satispaython import Payment
+from satispaython.models import loads
+
+
+def _body():
+    return json.dumps({
+        'id': str(uuid.uuid4()),
+        'code_identifier': 'S6Y-PAY--' + uuid.uuid4().hex[:8].upper(),
+        'type': 'TO_BUSINESS',
+        'amount_unit': 1999,
+        'currency': 'EUR',
+        'status': 'ACCEPTED',
+        'expired': False,
+        'metadata': {},
+        'sender': {'id': str(uuid.uuid4()), 'type': 'CONSUMER', 'name': 'Mario'},
+        'receiver': {'id': str(uuid.uuid4()), 'type': 'SHOP'},
+        'insert_date': '2019-03-18T16:10:24.000Z',
+        'expire_date': '2019-03-18T16:30:24.000Z'
+    }).encode()
+
+
+def _dicts(bodies):
+    return [json.loads(body) for body in bodies]
+
+
+def _lazy(bodies):
+    return [Payment(body) for body in bodies]
+
+
+def _unpacked(bodies):
+    payments = [Payment(body) for body in bodies]
+    for payment in payments:
+        payment.status
+    return payments
+
+
+def _measure(func, bodies):
+    start = time.perf_counter()
+    func(bodies)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func(bodies)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payments', type=int, default=100000)
+    args = parser.parse_args()
+    bodies = [_body() for _ in range(args.payments)]
+    print(f'JSON backend: {loads.__module__}')
+    for name, func in (('dict', _dicts), ('lazy', _lazy), ('unpacked', _unpacked)):
+        elapsed, peak = _measure(func, bodies)
+        print(f'{name:<10} {elapsed * 1e6 / args.payments:>8.2f} us/payment   '
+              f'{peak / args.payments:>8.0f} bytes/payment')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Microbenchmarks of the auth and client hot paths.
+
+All requests go through an in-process httpx.MockTransport, so the numbers only
+reflect the work done by satispaython and httpx on this machine.
+
+    python benchmarks/suite.py run                  # saves benchmarks/results/<git revision>.json
+    python benchmarks/suite.py run --quick --label wip
+    python benchmarks/suite.py compare results/abc1234.json results/wip.json --threshold 10
+
+`compare` exits with status 1 when any benchmark got slower than the threshold.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+
+from satispaython import AsyncSatispayClient, SatispayAuth, SatispayClient
+
+RESULTS = Path(__file__).resolve().parent / 'results'
+PAYMENTS_URL = 'https://authservices.satispay.com/g_business/v1/payments'
+PAYMENT_ID = '2936affa-ab4c-4daa-9bec-7cafbce4caa1'
+
+
+def _handler(request):
+    return httpx.Response(200, json={'id': PAYMENT_ID, 'status': 'PENDING', 'amount_unit': 100})
+
+
+def _measure(func, duration, min_rounds=3):
+    rounds, start = 0, time.perf_counter()
+    while True:
+        func()
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration and rounds >= min_rounds:
+            return rounds / elapsed
+
+
+def bench_auth(keys, body_sizes, duration):
+    for key_size, rsa_key in keys.items():
+        auth = SatispayAuth('key_id', rsa_key)
+        for body_size in body_sizes:
+            request = httpx.Request('POST', PAYMENTS_URL, content=b'x' * body_size)
+            ops = _measure(lambda: auth.auth_flow(request).send(None), duration)
+            yield f'auth.headers[rsa{key_size},body{body_size}]', ops
+
+
+def bench_sync_client(rsa_key, duration):
+    with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_handler)) as client:
+        yield 'client.create_payment', _measure(lambda: client.create_payment(100, 'EUR'), duration)
+        yield 'client.get_payment_details', _measure(lambda: client.get_payment_details(PAYMENT_ID), duration)
+
+
+async def _async_throughput(client, concurrency, duration):
+    done, deadline = 0, time.perf_counter() + duration
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await client.get_payment_details(PAYMENT_ID)
+            done += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - start)
+
+
+def bench_async_client(rsa_key, concurrencies, duration):
+    loop = asyncio.new_event_loop()
+    try:
+        for concurrency in concurrencies:
+            client = AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_handler))
+            ops = loop.run_until_complete(_async_throughput(client, concurrency, duration))
+            loop.run_until_complete(client.aclose())
+            yield f'async_client.get_payment_details[concurrency{concurrency}]', ops
+    finally:
+        loop.close()
+
+
+def _revision():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return output.decode().strip()
+
+
+def run(args):
+    key_sizes = (2048,) if args.quick else (2048, 4096)
+    body_sizes = (0, 1024) if args.quick else (0, 1024, 65536)
+    concurrencies = (1, 64) if args.quick else (1, 8, 64, 512)
+    keys = {key_size: generate_private_key(65537, key_size) for key_size in key_sizes}
+    benchmarks = (
+        bench_auth(keys, body_sizes, args.duration),
+        bench_sync_client(keys[2048], args.duration),
+        bench_async_client(keys[2048], concurrencies, args.duration),
+    )
+    results = {}
+    for benchmark in benchmarks:
+        for name, ops in benchmark:
+            results[name] = ops
+            print(f'{name:<60} {ops:>12.1f} ops/s')
+    label = args.label or _revision()
+    report = {
+        'label': label,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'httpx': httpx.__version__,
+        'results': results,
+    }
+    RESULTS.mkdir(exist_ok=True)
+    path = RESULTS / f'{label}.json'
+    path.write_text(json.dumps(report, indent=2))
+    print(f'saved {path}')
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text())['results']
+    current = json.loads(Path(args.current).read_text())['results']
+    regressions = 0
+    for name in sorted(set(baseline) & set(current)):
+        change = (current[name] - baseline[name]) / baseline[name] * 100
+        flag = ''
+        if change < -args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f'{name:<60} {baseline[name]:>12.1f} {current[name]:>12.1f} {change:>+8.1f}%{flag}')
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--duration', type=float, default=1.0, help='seconds spent on each benchmark')
+    run_parser.add_argument('--label', help='results file name, defaults to the git revision')
+    run_parser.add_argument('--quick', action='store_true', help='run a reduced matrix')
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=10.0, help='tolerated slowdown in percent')
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    elif args.command == 'compare':
+        sys.exit(compare(args))
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,62 @@
-from .api import create_payment, get_payment_details, obtain_key_id, test_authentication
-from .auth import SatispayAuth
-from .client import AsyncSatispayClient, SatispayClient
-
-try:
-    import importlib.metadata as _metadata
-except ModuleNotFoundError:
-    import importlib_metadata as _metadata
-
-__version__ = _metadata.version(__name__)
-
-__all__ = [
-    'obtain_key_id',
-    'test_authentication',
-    'create_payment',
-    'get_payment_details',
-    'SatispayClient',
-    'AsyncSatispayClient',
-    'SatispayAuth',
-]
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .api import create_payment, get_payment_details, obtain_key_id, test_authentication, update_payment
+    from .auth import SatispayAuth
+    from .client import AsyncSatispayClient, SatispayClient
+    from .merchants import AsyncMerchantManager, MerchantManager
+    from .models import Payment
+    from .ratelimit import RateLimiter
+    from .registry import ClientRegistry
+    from .retry import Retry
+    from .watcher import PaymentWatcher
+
+_exports = {
+    'obtain_key_id': 'api',
+    'test_authentication': 'api',
+    'create_payment': 'api',
+    'get_payment_details': 'api',
+    'update_payment': 'api',
+    'SatispayClient': 'client',
+    'AsyncSatispayClient': 'client',
+    'SatispayAuth': 'auth',
+    'ClientRegistry': 'registry',
+    'MerchantManager': 'merchants',
+    'AsyncMerchantManager': 'merchants',
+    'PaymentWatcher': 'watcher',
+    'Payment': 'models',
+    'Retry': 'retry',
+    'RateLimiter': 'ratelimit',
+}
+
+__all__ = list(_exports)
+
+
+def _version() -> str:
+    try:
+        import importlib.metadata as metadata
+    except ModuleNotFoundError:
+        import importlib_metadata as metadata
+    return metadata.version(__name__)
+
+
+def __getattr__(name: str) -> Any:
+    if name == '__version__':
+        value = _version()
+    elif name in _exports:
+        value = getattr(import_module(f'.{_exports[name]}', __name__), name)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__, '__version__'})
+
+
+if sys.version_info < (3, 7):
+    for _name in [*__all__, '__version__']:
+        __getattr__(_name)
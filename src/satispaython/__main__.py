@@ -0,0 +1,46 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from . import bench
+from .standin import StandInSatispay
+from .utils import load_key
+
+
+def _serve(options: argparse.Namespace) -> int:
+    standin = StandInSatispay(latency=options.latency, jitter=options.jitter, error_rate=options.error_rate)
+    for key_id, path in options.keys:
+        standin.register_key(key_id, load_key(path).public_key())
+    server = standin.serve(options.host, options.port)
+    print(f'Satispay stand-in listening on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m satispaython')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    bench_parser = commands.add_parser('bench', help='run a load test and report latency percentiles')
+    bench.add_arguments(bench_parser)
+    bench_parser.set_defaults(handler=bench.main)
+    standin_parser = commands.add_parser('standin', help='serve the Satispay stand-in over HTTP')
+    standin_parser.add_argument('--host', default='127.0.0.1')
+    standin_parser.add_argument('--port', type=int, default=8000)
+    standin_parser.add_argument('--latency', type=float, default=0.0)
+    standin_parser.add_argument('--jitter', type=float, default=0.0)
+    standin_parser.add_argument('--error-rate', type=float, default=0.0)
+    standin_parser.add_argument('--key', dest='keys', nargs=2, action='append', default=[],
+                                metavar=('KEY_ID', 'PATH'), help='register a key-id with its private key')
+    standin_parser.set_defaults(handler=_serve)
+    options = parser.parse_args(argv)
+    return options.handler(options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
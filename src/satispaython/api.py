@@ -1,18 +1,15 @@
 from typing import Optional
 
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
-from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 from httpx import Headers, Response
 
-from .client import SatispayClient
+from .client import SatispayClient, authentication_key_body
+from .registry import default_registry
 
 
 def obtain_key_id(token: str, rsa_key: RSAPrivateKey, staging: bool = False) -> Response:
     target = '/g_business/v1/authentication_keys'
-    key_encoding = Encoding.PEM
-    key_format = PublicFormat.SubjectPublicKeyInfo
-    public_key = rsa_key.public_key().public_bytes(key_encoding, key_format)
-    body = {'public_key': public_key.decode(), 'token': token}
+    body = authentication_key_body(token, rsa_key)
     with SatispayClient('PLACEHOLDER', rsa_key, staging) as client:
         return client.post(target, json=body)
 
@@ -20,7 +17,7 @@ def obtain_key_id(token: str, rsa_key: RSAPrivateKey, staging: bool = False) ->
 def test_authentication(key_id: str, rsa_key: RSAPrivateKey) -> Response:
     target = '/wally-services/protocol/tests/signature'
     headers = {'Content-Type': 'application/json'}
-    with SatispayClient(key_id, rsa_key, True) as client:
+    with default_registry.client(key_id, rsa_key, True) as client:
         return client.post(target, headers=headers)
 
 
@@ -33,7 +30,7 @@ def create_payment(
     headers: Optional[Headers] = None,
     staging: bool = False
 ) -> Response:
-    with SatispayClient(key_id, rsa_key, staging) as client:
+    with default_registry.client(key_id, rsa_key, staging) as client:
         return client.create_payment(amount_unit, currency, body_params, headers)
 
 
@@ -44,5 +41,18 @@ def get_payment_details(
     headers: Optional[Headers] = None,
     staging: bool = False
 ) -> Response:
-    with SatispayClient(key_id, rsa_key, staging) as client:
+    with default_registry.client(key_id, rsa_key, staging) as client:
         return client.get_payment_details(payment_id, headers)
+
+
+def update_payment(
+    key_id: str,
+    rsa_key: RSAPrivateKey,
+    payment_id: str,
+    action: str,
+    body_params: Optional[dict] = None,
+    headers: Optional[Headers] = None,
+    staging: bool = False
+) -> Response:
+    with default_registry.client(key_id, rsa_key, staging) as client:
+        return client.update_payment(payment_id, action, body_params, headers)
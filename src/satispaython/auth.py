@@ -1,57 +1,161 @@
+import asyncio
 from base64 import b64encode
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from hashlib import sha256
-from typing import Generator
+from time import perf_counter
+from typing import AsyncGenerator, Dict, Generator, Optional
 
 from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
 from cryptography.hazmat.primitives.hashes import SHA256
-from httpx import Auth, Headers, Request, Response
+from cryptography.hazmat.primitives.serialization import (
+    Encoding, NoEncryption, PrivateFormat, load_pem_private_key
+)
+from httpx import Auth, Request, Response
+
+from .metrics import RequestTimings, current_timings
+
+_PADDING = PKCS1v15()
+_ALGORITHM = Prehashed(SHA256())
+_EMPTY_DIGEST = 'SHA-256=' + b64encode(sha256(b'').digest()).decode()
+_METHODS = {method: method.lower().encode() for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')}
+_date_cache = (None, '')
+
+
+@lru_cache(maxsize=32)
+def _load_signing_key(pem: bytes) -> RSAPrivateKey:
+    return load_pem_private_key(pem, None)
+
+
+def _sign_with_pem(pem: bytes, string: bytes) -> str:
+    signature = _load_signing_key(pem).sign(sha256(string).digest(), _PADDING, _ALGORITHM)
+    return b64encode(signature).decode()
 
 
 class SatispayAuth(Auth):
     requires_request_body = True
 
-    def __init__(self, key_id: str, rsa_key: RSAPrivateKey) -> None:
+    def __init__(self, key_id: str, rsa_key: RSAPrivateKey, executor: Optional[Executor] = None) -> None:
         self._key_id = key_id
         self._rsa_key = rsa_key
+        self._executor = executor
+        self._key_pem = None
+        self._authorization_prefix = f'Signature keyId="{key_id}", ' \
+                                     f'algorithm="rsa-sha256", ' \
+                                     f'headers="(request-target) host date digest", ' \
+                                     f'signature="'
 
     @staticmethod
     def _get_formatted_date() -> str:
-        date = datetime.now(timezone.utc)
-        return date.strftime('%a, %d %b %Y %H:%M:%S %z')
+        global _date_cache
+        now = datetime.now(timezone.utc)
+        second = int(now.timestamp())
+        cached_second, date = _date_cache
+        if second != cached_second:
+            date = now.strftime('%a, %d %b %Y %H:%M:%S %z')
+            _date_cache = (second, date)
+        return date
 
     @staticmethod
     def _compute_digest(request: Request) -> str:
-        digest = sha256(request.content).digest()
-        digest = b64encode(digest).decode()
-        return f'SHA-256={digest}'
+        content = request.content
+        if not content:
+            return _EMPTY_DIGEST
+        digest = sha256(content).digest()
+        return 'SHA-256=' + b64encode(digest).decode()
 
     @staticmethod
-    def _compose_string(request: Request, date: str, digest: str) -> str:
-        method, target, host = request.method, request.url.path, request.url.host
-        return f'(request-target): {method.lower()} {target}\nhost: {host}\ndate: {date}\ndigest: {digest}'
+    def _compose_string(request: Request, host: str, date: str, digest: str) -> bytes:
+        method = request.method
+        return b''.join((
+            b'(request-target): ', _METHODS.get(method) or method.lower().encode(), b' ', request.url.raw_path,
+            b'\nhost: ', host.encode(),
+            b'\ndate: ', date.encode(),
+            b'\ndigest: ', digest.encode(),
+        ))
 
-    def _sign_string(self, string: str) -> str:
-        signature = self._rsa_key.sign(string.encode(), PKCS1v15(), SHA256())
+    def _sign_string(self, string: bytes) -> str:
+        signature = self._rsa_key.sign(sha256(string).digest(), _PADDING, _ALGORITHM)
         return b64encode(signature).decode()
 
+    def _get_key_pem(self) -> bytes:
+        if self._key_pem is None:
+            self._key_pem = self._rsa_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+        return self._key_pem
+
     def _compose_authorization_header(self, signature: str) -> str:
-        return f'Signature keyId="{self._key_id}", ' \
-               f'algorithm="rsa-sha256", ' \
-               f'headers="(request-target) host date digest", ' \
-               f'signature="{signature}"'
+        return self._authorization_prefix + signature + '"'
+
+    def _compose_headers(self, host: str, date: str, digest: str, signature: str) -> Dict[str, str]:
+        authorization_header = self._compose_authorization_header(signature)
+        return {'Host': host, 'Date': date, 'Digest': digest, 'Authorization': authorization_header}
 
-    def _generate_authorization_headers(self, request: Request) -> Headers:
+    def _generate_authorization_headers(
+        self,
+        request: Request,
+        timings: Optional[RequestTimings] = None
+    ) -> Dict[str, str]:
+        if timings is not None:
+            return self._generate_timed_authorization_headers(request, timings)
+        host = request.url.host
         date = self._get_formatted_date()
         digest = self._compute_digest(request)
-        string = self._compose_string(request, date, digest)
+        string = self._compose_string(request, host, date, digest)
         signature = self._sign_string(string)
-        authorization_header = self._compose_authorization_header(signature)
-        headers = {'Host': request.url.host, 'Date': date, 'Digest': digest, 'Authorization': authorization_header}
-        return Headers(headers)
+        return self._compose_headers(host, date, digest, signature)
+
+    def _generate_timed_authorization_headers(self, request: Request, timings: RequestTimings) -> Dict[str, str]:
+        start = perf_counter()
+        host = request.url.host
+        date = self._get_formatted_date()
+        digest = self._compute_digest(request)
+        digested = perf_counter()
+        string = self._compose_string(request, host, date, digest)
+        composed = perf_counter()
+        signature = self._sign_string(string)
+        signed = perf_counter()
+        headers = self._compose_headers(host, date, digest, signature)
+        timings.digest = digested - start
+        timings.compose = composed - digested + perf_counter() - signed
+        timings.sign = signed - composed
+        return headers
+
+    async def _async_generate_authorization_headers(
+        self,
+        request: Request,
+        timings: Optional[RequestTimings] = None
+    ) -> Dict[str, str]:
+        loop = asyncio.get_event_loop()
+        if not isinstance(self._executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(self._executor, self._generate_authorization_headers, request, timings)
+        start = perf_counter()
+        host = request.url.host
+        date = self._get_formatted_date()
+        digest = self._compute_digest(request)
+        digested = perf_counter()
+        string = self._compose_string(request, host, date, digest)
+        composed = perf_counter()
+        signature = await loop.run_in_executor(self._executor, _sign_with_pem, self._get_key_pem(), string)
+        if timings is not None:
+            timings.digest = digested - start
+            timings.compose = composed - digested
+            timings.sign = perf_counter() - composed
+        return self._compose_headers(host, date, digest, signature)
+
+    @staticmethod
+    def _apply_headers(request: Request, authorization_headers: Dict[str, str]) -> None:
+        headers = request.headers
+        for name, value in authorization_headers.items():
+            headers[name] = value
 
     def auth_flow(self, request: Request) -> Generator[Request, Response, None]:
-        authorization_headers = self._generate_authorization_headers(request)
-        request.headers.update(authorization_headers)
+        self._apply_headers(request, self._generate_authorization_headers(request, current_timings()))
+        yield request
+
+    async def async_auth_flow(self, request: Request) -> AsyncGenerator[Request, Response]:
+        await request.aread()
+        self._apply_headers(request, await self._async_generate_authorization_headers(request, current_timings()))
         yield request
@@ -0,0 +1,114 @@
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Iterable, Iterator, NamedTuple, Optional
+
+from httpx import Response
+
+
+class BatchResult(NamedTuple):
+    item: Any
+    response: Optional[Response] = None
+    error: Optional[Exception] = None
+
+
+async def _run(func: Callable[[Any], Awaitable[Response]], item: Any) -> BatchResult:
+    try:
+        return BatchResult(item, await func(item))
+    except Exception as error:
+        return BatchResult(item, error=error)
+
+
+def _call(func: Callable[[Any], Response], item: Any) -> BatchResult:
+    try:
+        return BatchResult(item, func(item))
+    except Exception as error:
+        return BatchResult(item, error=error)
+
+
+def _check_concurrency(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f'concurrency must be at least 1, got {concurrency}')
+
+
+def async_bounded_results(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    concurrency: int,
+    ordered: bool = False
+) -> AsyncIterator[Any]:
+    _check_concurrency(concurrency)
+    return _async_bounded_results(func, iter(items), concurrency, ordered)
+
+
+async def _async_bounded_results(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterator[Any],
+    concurrency: int,
+    ordered: bool
+) -> AsyncIterator[Any]:
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        while True:
+            for item in islice(items, concurrency - len(pending)):
+                pending.append(asyncio.ensure_future(func(item)))
+            if not pending:
+                return
+            if ordered:
+                yield await pending[0]
+                pending.popleft()
+                continue
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending = deque(task for task in pending if task not in done)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def async_bounded_map(
+    func: Callable[[Any], Awaitable[Response]],
+    items: Iterable[Any],
+    concurrency: int,
+    ordered: bool = False
+) -> AsyncIterator[BatchResult]:
+    return async_bounded_results(lambda item: _run(func, item), items, concurrency, ordered)
+
+
+def bounded_map(
+    func: Callable[[Any], Response],
+    items: Iterable[Any],
+    concurrency: int,
+    ordered: bool = False
+) -> Iterator[BatchResult]:
+    _check_concurrency(concurrency)
+    return _bounded_map(func, iter(items), concurrency, ordered)
+
+
+def _bounded_map(
+    func: Callable[[Any], Response],
+    items: Iterator[Any],
+    concurrency: int,
+    ordered: bool
+) -> Iterator[BatchResult]:
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(concurrency) as executor:
+        try:
+            while True:
+                for item in islice(items, concurrency - len(pending)):
+                    pending.append(executor.submit(_call, func, item))
+                if not pending:
+                    return
+                if ordered:
+                    yield pending[0].result()
+                    pending.popleft()
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending = deque(future for future in pending if future not in done)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
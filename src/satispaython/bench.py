@@ -0,0 +1,238 @@
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, generate_private_key
+from httpx import Limits, Response
+
+from .auth import SatispayAuth
+from .client import AsyncSatispayClient, SatispayClient
+from .standin import StandInSatispay
+from .utils import load_key
+
+_thread_time = getattr(time, 'thread_time', time.process_time)
+
+
+class BenchReport(NamedTuple):
+    mode: str
+    elapsed: float
+    latencies: List[float]
+    errors: Counter
+    signing: float
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        index = max(math.ceil(percentile / 100 * len(latencies)) - 1, 0)
+        return latencies[index]
+
+
+class _SigningTimer:
+
+    def __init__(self, auth: SatispayAuth) -> None:
+        self.total = 0.0
+        self._lock = threading.Lock()
+        self._generate = auth._generate_authorization_headers
+        auth._generate_authorization_headers = self._generate_authorization_headers
+
+    def _generate_authorization_headers(self, *args, **kwargs) -> Dict[str, str]:
+        start = _thread_time()
+        try:
+            return self._generate(*args, **kwargs)
+        finally:
+            elapsed = _thread_time() - start
+            with self._lock:
+                self.total += elapsed
+
+
+class _Workload:
+
+    def __init__(self, requests: Optional[int], duration: Optional[float], rate: Optional[float],
+                 create_ratio: float, seed: Optional[int]) -> None:
+        self._requests = requests
+        self._duration = duration
+        self._rate = rate
+        self._create_ratio = create_ratio
+        self._random = random.Random(seed)
+        self._issued = 0
+        self._lock = threading.Lock()
+        self.payment_ids: List[str] = []
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def next(self) -> Optional[tuple]:
+        with self._lock:
+            now = time.perf_counter()
+            if self._requests is not None and self._issued >= self._requests:
+                return None
+            if self._duration is not None and now - self.started >= self._duration:
+                return None
+            due = now if self._rate is None else self.started + self._issued / self._rate
+            self._issued += 1
+            create = not self.payment_ids or self._random.random() < self._create_ratio
+            payment_id = None if create else self._random.choice(self.payment_ids)
+        return due, payment_id
+
+    def record(self, due: float, response: Optional[Response], error: Optional[Exception] = None) -> None:
+        self.latencies.append(time.perf_counter() - due)
+        if error is not None:
+            self.errors[type(error).__name__] += 1
+        elif response.is_error:
+            self.errors[str(response.status_code)] += 1
+        elif response.request.method == 'POST':
+            self.payment_ids.append(response.json()['id'])
+
+
+def _client_options(options: argparse.Namespace, standin: Optional[StandInSatispay], asgi: bool) -> dict:
+    kwargs = {'limits': Limits(max_connections=options.concurrency, max_keepalive_connections=options.concurrency)}
+    if standin is None:
+        kwargs['base_url'] = options.base_url
+    else:
+        kwargs['app'] = standin if asgi else standin.wsgi
+        kwargs['base_url'] = 'http://standin'
+    return kwargs
+
+
+async def _run_async(options: argparse.Namespace, key_id: str, rsa_key: RSAPrivateKey,
+                     standin: Optional[StandInSatispay]) -> BenchReport:
+    kwargs = _client_options(options, standin, asgi=True)
+    async with AsyncSatispayClient(key_id, rsa_key, **kwargs) as client:
+        timer = _SigningTimer(client.auth)
+        workload = _Workload(options.requests, options.duration, options.rate, options.create_ratio, options.seed)
+
+        async def worker() -> None:
+            while True:
+                task = workload.next()
+                if task is None:
+                    return
+                due, payment_id = task
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    if payment_id is None:
+                        response = await client.create_payment(100, 'EUR')
+                    else:
+                        response = await client.get_payment_details(payment_id)
+                except Exception as error:
+                    workload.record(due, None, error)
+                else:
+                    workload.record(due, response)
+
+        await asyncio.gather(*(worker() for _ in range(options.concurrency)))
+    elapsed = time.perf_counter() - workload.started
+    return BenchReport('async', elapsed, workload.latencies, workload.errors, timer.total)
+
+
+def _run_threads(options: argparse.Namespace, key_id: str, rsa_key: RSAPrivateKey,
+                 standin: Optional[StandInSatispay]) -> BenchReport:
+    kwargs = _client_options(options, standin, asgi=False)
+    with SatispayClient(key_id, rsa_key, **kwargs) as client:
+        timer = _SigningTimer(client.auth)
+        workload = _Workload(options.requests, options.duration, options.rate, options.create_ratio, options.seed)
+
+        def worker() -> None:
+            while True:
+                task = workload.next()
+                if task is None:
+                    return
+                due, payment_id = task
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    if payment_id is None:
+                        response = client.create_payment(100, 'EUR')
+                    else:
+                        response = client.get_payment_details(payment_id)
+                except Exception as error:
+                    workload.record(due, None, error)
+                else:
+                    workload.record(due, response)
+
+        with ThreadPoolExecutor(options.concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(options.concurrency)]:
+                future.result()
+    elapsed = time.perf_counter() - workload.started
+    return BenchReport('threads', elapsed, workload.latencies, workload.errors, timer.total)
+
+
+def format_report(report: BenchReport) -> str:
+    lines = [
+        f'mode        {report.mode}',
+        f'requests    {report.requests} in {report.elapsed:.2f} s ({report.throughput:.1f} req/s)',
+        'latency     ' + '   '.join(
+            f'{name} {report.percentile(percentile) * 1000:.2f} ms'
+            for name, percentile in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+        ),
+        f'signing     {report.signing:.2f} s CPU total, '
+        f'{report.signing * 1000 / max(report.requests, 1):.2f} ms per request',
+    ]
+    if report.errors:
+        errors = ', '.join(f'{name}: {count}' for name, count in report.errors.most_common())
+        lines.append(f'errors      {sum(report.errors.values())} ({errors})')
+    else:
+        lines.append('errors      0')
+    return '\n'.join(lines)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--mode', choices=('async', 'threads'), default='async')
+    parser.add_argument('--requests', type=int, help='total requests (default 1000 without --duration)')
+    parser.add_argument('--duration', type=float, help='run for this many seconds')
+    parser.add_argument('--concurrency', type=int, default=10, help='concurrent requests or threads')
+    parser.add_argument('--rate', type=float, help='target requests per second (default: as fast as possible)')
+    parser.add_argument('--create-ratio', type=float, default=0.2, help='share of create_payment requests')
+    parser.add_argument('--base-url', help='Satispay or stand-in URL (default: in-process stand-in)')
+    parser.add_argument('--key-id', help='key-id to sign with (required with --base-url)')
+    parser.add_argument('--key', help='path of the private key (required with --base-url)')
+    parser.add_argument('--password', help='password of the private key')
+    parser.add_argument('--key-size', type=int, default=4096, help='size of the generated in-process key')
+    parser.add_argument('--latency', type=float, default=0.0, help='in-process stand-in latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='in-process stand-in error rate')
+    parser.add_argument('--seed', type=int)
+
+
+def run(options: argparse.Namespace) -> BenchReport:
+    if options.requests is None and options.duration is None:
+        options.requests = 1000
+    if options.base_url is None:
+        rsa_key = generate_private_key(65537, options.key_size)
+        key_id = 'bench'
+        standin = StandInSatispay(latency=options.latency, error_rate=options.error_rate, seed=options.seed)
+        standin.register_key(key_id, rsa_key.public_key())
+    else:
+        if options.key is None or options.key_id is None:
+            raise SystemExit('--key and --key-id are required with --base-url')
+        rsa_key = load_key(options.key, options.password)
+        key_id = options.key_id
+        standin = None
+    if options.mode == 'async':
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(_run_async(options, key_id, rsa_key, standin))
+        finally:
+            loop.close()
+    return _run_threads(options, key_id, rsa_key, standin)
+
+
+def main(options: argparse.Namespace, output: Callable[[str], None] = print) -> int:
+    report = run(options)
+    output(format_report(report))
+    return 0
@@ -0,0 +1,134 @@
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Dict, NamedTuple, Optional
+
+from httpx import Request, Response
+
+from .models import ACCEPTED, CANCELED, PENDING
+
+
+class CacheBackend(ABC):
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._maxsize = maxsize
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            try:
+                expires_at, value = self._entries[key]
+            except KeyError:
+                return None
+            if expires_at is not None and expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = None if ttl is None else monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PaymentCache:
+
+    DEFAULT_TTLS = {ACCEPTED: None, CANCELED: None, PENDING: 2.0}
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+        default_ttl: float = 2.0
+    ) -> None:
+        self._backend = MemoryCache() if backend is None else backend
+        self._ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self._default_ttl = default_ttl
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses)
+
+    def get(self, key: str, request: Optional[Request] = None) -> Optional[Response]:
+        content = self._backend.get(key)
+        with self._lock:
+            if content is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        headers = {'Content-Type': 'application/json'}
+        return Response(200, headers=headers, content=content, request=request)
+
+    def store(self, key: str, response: Response) -> None:
+        if response.status_code != 200:
+            return
+        try:
+            status = json.loads(response.content).get('status')
+        except (ValueError, AttributeError):
+            return
+        ttl = self._ttls.get(status, self._default_ttl)
+        if ttl is None or ttl > 0:
+            self._backend.set(key, response.content, ttl)
+
+    def invalidate(self, key: str) -> None:
+        self._backend.delete(key)
+
+    def clear(self) -> None:
+        self._backend.clear()
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
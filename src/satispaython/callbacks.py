@@ -0,0 +1,176 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Set
+from urllib.parse import parse_qs
+
+from .client import AsyncSatispayClient
+from .models import Payment
+
+PaymentHandler = Callable[[Payment], Awaitable[None]]
+
+
+class CallbackStats(NamedTuple):
+    received: int
+    duplicates: int
+    rejected: int
+    resolved: int
+    failed: int
+
+
+class CallbackReceiver:
+
+    def __init__(
+        self,
+        client: AsyncSatispayClient,
+        handler: PaymentHandler,
+        dedupe_window: float = 60.0,
+        batch_size: int = 50,
+        batch_delay: float = 0.05,
+        concurrency: int = 10,
+        max_pending: int = 1000,
+        retry_after: int = 1,
+        param: str = 'payment_id'
+    ) -> None:
+        self._client = client
+        self._handler = handler
+        self._dedupe_window = dedupe_window
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._concurrency = concurrency
+        self._retry_after = str(retry_after).encode()
+        self._param = param
+        self._queue = asyncio.Queue(max_pending)
+        self._pending: Set[str] = set()
+        self._settled: 'OrderedDict[str, float]' = OrderedDict()
+        self._worker: Optional[asyncio.Future] = None
+        self._received = self._duplicates = self._rejected = self._resolved = self._failed = 0
+
+    async def __aenter__(self) -> 'CallbackReceiver':
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def stats(self) -> CallbackStats:
+        return CallbackStats(self._received, self._duplicates, self._rejected, self._resolved, self._failed)
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    def submit(self, payment_id: str) -> bool:
+        self._received += 1
+        if payment_id in self._pending or self._is_settled(payment_id):
+            self._duplicates += 1
+            return True
+        try:
+            self._queue.put_nowait(payment_id)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            return False
+        self._pending.add(payment_id)
+        self.start()
+        return True
+
+    def _is_settled(self, payment_id: str) -> bool:
+        now = asyncio.get_event_loop().time()
+        settled = self._settled
+        while settled:
+            oldest = next(iter(settled.values()))
+            if now - oldest < self._dedupe_window:
+                break
+            settled.popitem(last=False)
+        return payment_id in settled
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        query = parse_qs(scope.get('query_string', b'').decode())
+        payment_id = query.get(self._param, [None])[0]
+        if not payment_id:
+            await self._respond(send, 400)
+        elif self.submit(payment_id):
+            await self._respond(send, 200)
+        else:
+            await self._respond(send, 503, [(b'retry-after', self._retry_after)])
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _respond(send: Callable, status: int, headers: Optional[list] = None) -> None:
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers or []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self._batch_delay
+                while len(batch) < self._batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._resolve(batch)
+            finally:
+                self._pending.difference_update(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _resolve(self, batch: List[str]) -> None:
+        loop = asyncio.get_event_loop()
+        async for result in self._client.get_payments_details(batch, concurrency=self._concurrency):
+            self._pending.discard(result.item)
+            error = result.error
+            if error is None and result.response.is_error:
+                error = RuntimeError(f'status code {result.response.status_code}')
+            if error is None:
+                try:
+                    payment = Payment.from_response(result.response)
+                    terminal = payment.is_terminal
+                except Exception as parse_error:
+                    error = parse_error
+            if error is not None:
+                self._failed += 1
+                loop.call_exception_handler({
+                    'message': f'Failed to resolve callback for payment {result.item}',
+                    'exception': error,
+                })
+                continue
+            if terminal:
+                self._settled.pop(result.item, None)
+                self._settled[result.item] = loop.time()
+            self._resolved += 1
+            try:
+                await self._handler(payment)
+            except Exception as error:
+                loop.call_exception_handler({
+                    'message': f'Exception in callback handler for payment {result.item}',
+                    'exception': error,
+                })
@@ -1,22 +1,222 @@
-from typing import Optional
+import asyncio
+import logging
+import threading
+import warnings
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, Union
+from uuid import uuid4
 
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
-from httpx import URL, AsyncClient, Client, Headers, Response
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from httpx import (
+    URL, AsyncBaseTransport, AsyncClient, AsyncHTTPTransport, BaseTransport, Client, Headers, HTTPError,
+    HTTPTransport, Limits, Request, Response
+)
 
 from .auth import SatispayAuth
+from .batch import BatchResult, async_bounded_map, bounded_map
+from .cache import PaymentCache
+from .hedge import HedgePolicy
+from .metrics import (
+    AsyncTimingTransport, ConnectionStats, MetricsHook, RequestTimings, TimingTransport, _ConnectionTracker,
+    _TimingAsyncBackend, _TimingSyncBackend, _reset_timings, _set_timings, _timing_async_backend, _timing_sync_backend
+)
+from .models import Payment, loads
+from .ratelimit import RateLimiter
+from .retry import Retry
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .utils import format_datetime
+
+_logger = logging.getLogger('satispaython')
+
+HTTP2_LIMITS = Limits(max_connections=100, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_base_url(staging: bool = False, base_url: Union[URL, str, None] = None) -> URL:
+    if base_url is not None:
+        return URL(base_url)
+    if staging:
+        return URL('https://staging.authservices.satispay.com')
+    return URL('https://authservices.satispay.com')
+
+
+def json_headers(headers: Optional[Headers] = None) -> Headers:
+    headers = Headers(headers)
+    headers['Content-Type'] = 'application/json'
+    return headers
+
+
+def authentication_key_body(token: str, rsa_key: RSAPrivateKey) -> dict:
+    key_encoding = Encoding.PEM
+    key_format = PublicFormat.SubjectPublicKeyInfo
+    public_key = rsa_key.public_key().public_bytes(key_encoding, key_format)
+    return {'public_key': public_key.decode(), 'token': token}
+
+
+def payment_headers(headers: Optional[Headers] = None) -> Headers:
+    headers = json_headers(headers)
+    if 'Idempotency-Key' not in headers:
+        headers['Idempotency-Key'] = str(uuid4())
+    return headers
+
+
+def payment_body(amount_unit: int, currency: str, body_params: Optional[dict] = None) -> dict:
+    try:
+        body_params.update({'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency})
+    except AttributeError:
+        body_params = {'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency}
+    return body_params
+
+
+def payment_update_body(action: str, body_params: Optional[dict] = None) -> dict:
+    try:
+        body_params.update({'action': action})
+    except AttributeError:
+        body_params = {'action': action}
+    return body_params
+
+
+def payments_query(
+    status: Optional[str] = None,
+    starting_after_timestamp: Optional[datetime] = None,
+    limit: int = 100
+) -> dict:
+    params = {'limit': limit}
+    if status is not None:
+        params['status'] = status
+    if starting_after_timestamp is not None:
+        params['starting_after_timestamp'] = format_datetime(starting_after_timestamp)
+    return params
 
 
 class SatispayClient(Client):
 
-    def __init__(self, key_id: str, rsa_key: RSAPrivateKey, staging: bool = False, **kwargs) -> None:
+    def __init__(
+        self,
+        key_id: str,
+        rsa_key: RSAPrivateKey,
+        staging: bool = False,
+        cache: Optional[PaymentCache] = None,
+        metrics: Optional[MetricsHook] = None,
+        retry: Optional[Retry] = None,
+        coalesce: bool = False,
+        rate_limit: Optional[RateLimiter] = None,
+        track_connections: bool = False,
+        **kwargs
+    ) -> None:
+        self._metrics = metrics
+        self._retry = retry
+        self._rate_limit = rate_limit
+        self._flights = SingleFlight() if coalesce else None
+        self._track_connections = track_connections
+        self._backend: Optional[_TimingSyncBackend] = None
+        self._connections: Optional[_ConnectionTracker] = None
+        self._keepalive: Optional[tuple] = None
         auth = SatispayAuth(key_id, rsa_key)
-        headers = kwargs.get('headers', Headers())
+        headers = Headers(kwargs.pop('headers', None))
         headers.update({'Accept': 'application/json'})
-        if staging:
-            base_url = URL('https://staging.authservices.satispay.com')
-        else:
-            base_url = URL('https://authservices.satispay.com')
+        base_url = get_base_url(staging, kwargs.pop('base_url', None))
         super().__init__(auth=auth, headers=headers, base_url=base_url, **kwargs)
+        self._cache = cache
+        self._cache_prefix = f'{base_url.host}/{key_id}/'
+        self._rate_limit_key = f'{base_url.host}/{key_id}'
+
+    def _init_transport(self, transport: Optional[BaseTransport] = None, app=None, **kwargs) -> BaseTransport:
+        self._backend = _timing_sync_backend() if transport is None and app is None else None
+        if self._backend is not None:
+            if self._track_connections:
+                self._connections = _ConnectionTracker(self._backend)
+            transport = HTTPTransport(backend=self._backend, **kwargs)
+        if self._metrics is None:
+            return super()._init_transport(transport=transport, app=app, **kwargs)
+        return TimingTransport(super()._init_transport(transport=transport, app=app, **kwargs))
+
+    def __exit__(self, *args) -> None:
+        self.stop_keepalive()
+        super().__exit__(*args)
+
+    def close(self) -> None:
+        self.stop_keepalive()
+        super().close()
+
+    def send(self, request: Request, **kwargs) -> Response:
+        if self._retry is not None and self._retry.is_retryable(request):
+            return self._retry.send(self._send_attempt, request, **kwargs)
+        return self._send_attempt(request, **kwargs)
+
+    def _send_attempt(self, request: Request, **kwargs) -> Response:
+        if self._rate_limit is not None:
+            return self._rate_limit.send(self._rate_limit_key, self._send_timed, request, **kwargs)
+        return self._send_timed(request, **kwargs)
+
+    def _send_timed(self, request: Request, **kwargs) -> Response:
+        if self._metrics is None and self._connections is None:
+            return super().send(request, **kwargs)
+        timings = RequestTimings(request.method, request.url.path)
+        token = _set_timings(timings)
+        start = perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+            timings.status_code = response.status_code
+            return response
+        finally:
+            timings.total = perf_counter() - start
+            _reset_timings(token)
+            if self._connections is not None:
+                self._connections.on_request(timings)
+            if self._metrics is not None:
+                self._metrics.on_request(timings)
+
+    def connection_stats(self) -> ConnectionStats:
+        return ConnectionStats(0, 0, 0) if self._connections is None else self._connections.stats()
+
+    def _opened(self) -> int:
+        return 0 if self._backend is None else self._backend.opened
+
+    def warmup(self, connections: int = 1) -> int:
+        if connections < 1:
+            return 0
+        opened = self._opened()
+        with ThreadPoolExecutor(connections) as executor:
+            for future in [executor.submit(self._ping) for _ in range(connections)]:
+                future.result()
+        return self._opened() - opened
+
+    def _ping(self) -> None:
+        super().send(self.build_request('HEAD', '/'), auth=None)
+
+    def start_keepalive(self, interval: float, connections: int = 1) -> None:
+        self.stop_keepalive()
+        stopped = threading.Event()
+        thread = threading.Thread(target=self._keep_alive, args=(stopped, interval, connections), daemon=True)
+        self._keepalive = (stopped, thread)
+        thread.start()
+
+    def stop_keepalive(self) -> None:
+        if self._keepalive is not None:
+            stopped, thread = self._keepalive
+            self._keepalive = None
+            stopped.set()
+            thread.join()
+
+    def _keep_alive(self, stopped: threading.Event, interval: float, connections: int) -> None:
+        while not stopped.wait(interval):
+            try:
+                self.warmup(connections)
+            except HTTPError:
+                pass
+            except Exception:
+                _logger.exception('Keep-alive ping failed')
 
     def create_payment(
         self,
@@ -26,32 +226,238 @@ class SatispayClient(Client):
         headers: Optional[Headers] = None
     ) -> Response:
         target = URL('/g_business/v1/payments')
-        try:
-            headers.update({'Content-Type': 'application/json'})
-        except AttributeError:
-            headers = Headers({'Content-Type': 'application/json'})
-        try:
-            body_params.update({'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency})
-        except AttributeError:
-            body_params = {'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency}
+        headers = payment_headers(headers)
+        body_params = payment_body(amount_unit, currency, body_params)
         return self.post(target, json=body_params, headers=headers)
 
+    @property
+    def coalesced(self) -> int:
+        return 0 if self._flights is None else self._flights.coalesced
+
+    def update_payment(
+        self,
+        payment_id: str,
+        action: str,
+        body_params: Optional[dict] = None,
+        headers: Optional[Headers] = None
+    ) -> Response:
+        target = URL(f'/g_business/v1/payments/{payment_id}')
+        headers = json_headers(headers)
+        body_params = payment_update_body(action, body_params)
+        response = self.put(target, json=body_params, headers=headers)
+        self._refresh_cache(payment_id, response)
+        return response
+
+    def _refresh_cache(self, payment_id: str, response: Response) -> None:
+        if self._cache is not None:
+            key = self._cache_prefix + payment_id
+            self._cache.invalidate(key)
+            self._cache.store(key, response)
+
     def get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
+        if self._flights is None or headers:
+            return self._get_payment_details(payment_id, headers)
+        return self._flights.do(payment_id, lambda: self._get_payment_details(payment_id))
+
+    def _get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
         target = URL(f'/g_business/v1/payments/{payment_id}')
-        return self.get(target, headers=headers)
+        if self._cache is None:
+            return self.get(target, headers=headers)
+        key = self._cache_prefix + payment_id
+        response = self._cache.get(key, self.build_request('GET', target, headers=headers))
+        if response is None:
+            response = self.get(target, headers=headers)
+            self._cache.store(key, response)
+        return response
+
+    def iter_payments(
+        self,
+        status: Optional[str] = None,
+        starting_after_timestamp: Optional[datetime] = None,
+        starting_after: Optional[str] = None,
+        limit: int = 100,
+        headers: Optional[Headers] = None
+    ) -> Iterator[Payment]:
+        params = payments_query(status, starting_after_timestamp, limit)
+        with ThreadPoolExecutor(1) as executor:
+            page = executor.submit(self._get_payments_page, params, starting_after, headers)
+            while page is not None:
+                data, has_more = page.result()
+                page = None
+                if has_more and data:
+                    page = executor.submit(self._get_payments_page, params, data[-1]['id'], headers)
+                for payment in data:
+                    yield Payment.from_dict(payment)
+
+    def _get_payments_page(self, params: dict, starting_after: Optional[str], headers: Optional[Headers]) -> tuple:
+        if starting_after is not None:
+            params = {**params, 'starting_after': starting_after}
+        response = self.get(URL('/g_business/v1/payments'), params=params, headers=headers)
+        response.raise_for_status()
+        page = loads(response.content)
+        return page.get('data', []), page.get('has_more', False)
+
+    def map(
+        self,
+        func: Callable[[Any], Response],
+        items: Iterable[Any],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> Iterator[BatchResult]:
+        return bounded_map(func, items, concurrency, ordered)
+
+    def create_payments(
+        self,
+        payments: Iterable[dict],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> Iterator[BatchResult]:
+        return self.map(lambda payment: self.create_payment(**payment), payments, concurrency, ordered)
+
+    def get_payments_details(
+        self,
+        payment_ids: Iterable[str],
+        headers: Optional[Headers] = None,
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> Iterator[BatchResult]:
+        return self.map(
+            lambda payment_id: self.get_payment_details(payment_id, headers), payment_ids, concurrency, ordered
+        )
 
 
 class AsyncSatispayClient(AsyncClient):
 
-    def __init__(self, key_id: str, rsa_key: RSAPrivateKey, staging: bool = False, **kwargs) -> None:
-        auth = SatispayAuth(key_id, rsa_key)
-        headers = kwargs.get('headers', Headers())
+    def __init__(
+        self,
+        key_id: str,
+        rsa_key: RSAPrivateKey,
+        staging: bool = False,
+        executor: Optional[Executor] = None,
+        cache: Optional[PaymentCache] = None,
+        metrics: Optional[MetricsHook] = None,
+        retry: Optional[Retry] = None,
+        hedge: Optional[HedgePolicy] = None,
+        coalesce: bool = False,
+        rate_limit: Optional[RateLimiter] = None,
+        track_connections: bool = False,
+        **kwargs
+    ) -> None:
+        self._metrics = metrics
+        self._retry = retry
+        self._rate_limit = rate_limit
+        self._hedge = hedge
+        self._flights = AsyncSingleFlight() if coalesce else None
+        self._track_connections = track_connections
+        self._backend: Optional[_TimingAsyncBackend] = None
+        self._connections: Optional[_ConnectionTracker] = None
+        self._keepalive: Optional[tuple] = None
+        if kwargs.get('http2'):
+            kwargs.setdefault('limits', HTTP2_LIMITS)
+            if not _http2_available():
+                warnings.warn('HTTP/2 requires satispaython[http2], falling back to HTTP/1.1', RuntimeWarning)
+                kwargs['http2'] = False
+        auth = SatispayAuth(key_id, rsa_key, executor)
+        headers = Headers(kwargs.pop('headers', None))
         headers.update({'Accept': 'application/json'})
-        if staging:
-            base_url = URL('https://staging.authservices.satispay.com')
-        else:
-            base_url = URL('https://authservices.satispay.com')
+        base_url = get_base_url(staging, kwargs.pop('base_url', None))
         super().__init__(auth=auth, headers=headers, base_url=base_url, **kwargs)
+        self._cache = cache
+        self._cache_prefix = f'{base_url.host}/{key_id}/'
+        self._rate_limit_key = f'{base_url.host}/{key_id}'
+
+    def _init_transport(
+        self,
+        transport: Optional[AsyncBaseTransport] = None,
+        app=None,
+        **kwargs
+    ) -> AsyncBaseTransport:
+        self._backend = _timing_async_backend() if transport is None and app is None else None
+        if self._backend is not None:
+            if self._track_connections:
+                self._connections = _ConnectionTracker(self._backend)
+            transport = AsyncHTTPTransport(backend=self._backend, **kwargs)
+        if self._metrics is None:
+            return super()._init_transport(transport=transport, app=app, **kwargs)
+        return AsyncTimingTransport(super()._init_transport(transport=transport, app=app, **kwargs))
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop_keepalive()
+        await super().__aexit__(*args)
+
+    async def aclose(self) -> None:
+        await self.stop_keepalive()
+        await super().aclose()
+
+    async def send(self, request: Request, **kwargs) -> Response:
+        if self._retry is not None and self._retry.is_retryable(request):
+            return await self._retry.async_send(self._send_attempt, request, **kwargs)
+        return await self._send_attempt(request, **kwargs)
+
+    async def _send_attempt(self, request: Request, **kwargs) -> Response:
+        if self._rate_limit is not None:
+            return await self._rate_limit.async_send(self._rate_limit_key, self._send_timed, request, **kwargs)
+        return await self._send_timed(request, **kwargs)
+
+    async def _send_timed(self, request: Request, **kwargs) -> Response:
+        if self._metrics is None and self._connections is None:
+            return await super().send(request, **kwargs)
+        timings = RequestTimings(request.method, request.url.path)
+        token = _set_timings(timings)
+        start = perf_counter()
+        try:
+            response = await super().send(request, **kwargs)
+            timings.status_code = response.status_code
+            return response
+        finally:
+            timings.total = perf_counter() - start
+            _reset_timings(token)
+            if self._connections is not None:
+                self._connections.on_request(timings)
+            if self._metrics is not None:
+                self._metrics.on_request(timings)
+
+    def connection_stats(self) -> ConnectionStats:
+        return ConnectionStats(0, 0, 0) if self._connections is None else self._connections.stats()
+
+    def _opened(self) -> int:
+        return 0 if self._backend is None else self._backend.opened
+
+    async def warmup(self, connections: int = 1) -> int:
+        if connections < 1:
+            return 0
+        opened = self._opened()
+        await asyncio.gather(*(self._ping() for _ in range(connections)))
+        return self._opened() - opened
+
+    async def _ping(self) -> None:
+        await super().send(self.build_request('HEAD', '/'), auth=None)
+
+    async def start_keepalive(self, interval: float, connections: int = 1) -> None:
+        await self.stop_keepalive()
+        stopped = asyncio.Event()
+        self._keepalive = (stopped, asyncio.ensure_future(self._keep_alive(stopped, interval, connections)))
+
+    async def stop_keepalive(self) -> None:
+        if self._keepalive is not None:
+            stopped, task = self._keepalive
+            self._keepalive = None
+            stopped.set()
+            await task
+
+    async def _keep_alive(self, stopped: asyncio.Event, interval: float, connections: int) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(stopped.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.warmup(connections)
+            except HTTPError:
+                pass
+            except Exception:
+                _logger.exception('Keep-alive ping failed')
 
     async def create_payment(
         self,
@@ -61,16 +467,114 @@ class AsyncSatispayClient(AsyncClient):
         headers: Optional[Headers] = None
     ) -> Response:
         target = URL('/g_business/v1/payments')
-        try:
-            headers.update({'Content-Type': 'application/json'})
-        except AttributeError:
-            headers = Headers({'Content-Type': 'application/json'})
-        try:
-            body_params.update({'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency})
-        except AttributeError:
-            body_params = {'flow': 'MATCH_CODE', 'amount_unit': amount_unit, 'currency': currency}
+        headers = payment_headers(headers)
+        body_params = payment_body(amount_unit, currency, body_params)
         return await self.post(target, json=body_params, headers=headers)
 
+    @property
+    def coalesced(self) -> int:
+        return 0 if self._flights is None else self._flights.coalesced
+
+    async def update_payment(
+        self,
+        payment_id: str,
+        action: str,
+        body_params: Optional[dict] = None,
+        headers: Optional[Headers] = None
+    ) -> Response:
+        target = URL(f'/g_business/v1/payments/{payment_id}')
+        headers = json_headers(headers)
+        body_params = payment_update_body(action, body_params)
+        response = await self.put(target, json=body_params, headers=headers)
+        self._refresh_cache(payment_id, response)
+        return response
+
+    def _refresh_cache(self, payment_id: str, response: Response) -> None:
+        if self._cache is not None:
+            key = self._cache_prefix + payment_id
+            self._cache.invalidate(key)
+            self._cache.store(key, response)
+
     async def get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
+        if self._flights is None or headers:
+            return await self._get_payment_details(payment_id, headers)
+        return await self._flights.do(payment_id, lambda: self._get_payment_details(payment_id))
+
+    async def _get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
         target = URL(f'/g_business/v1/payments/{payment_id}')
-        return await self.get(target, headers=headers)
+        if self._cache is None:
+            return await self._get_payment(target, headers)
+        key = self._cache_prefix + payment_id
+        response = self._cache.get(key, self.build_request('GET', target, headers=headers))
+        if response is None:
+            response = await self._get_payment(target, headers)
+            self._cache.store(key, response)
+        return response
+
+    async def _get_payment(self, target: URL, headers: Optional[Headers] = None) -> Response:
+        if self._hedge is None:
+            return await self.get(target, headers=headers)
+        return await self._hedge.run(lambda: self.get(target, headers=headers))
+
+    async def iter_payments(
+        self,
+        status: Optional[str] = None,
+        starting_after_timestamp: Optional[datetime] = None,
+        starting_after: Optional[str] = None,
+        limit: int = 100,
+        headers: Optional[Headers] = None
+    ) -> AsyncIterator[Payment]:
+        params = payments_query(status, starting_after_timestamp, limit)
+        page = asyncio.ensure_future(self._get_payments_page(params, starting_after, headers))
+        try:
+            while page is not None:
+                data, has_more = await page
+                page = None
+                if has_more and data:
+                    page = asyncio.ensure_future(self._get_payments_page(params, data[-1]['id'], headers))
+                for payment in data:
+                    yield Payment.from_dict(payment)
+        finally:
+            if page is not None:
+                page.cancel()
+
+    async def _get_payments_page(
+        self,
+        params: dict,
+        starting_after: Optional[str],
+        headers: Optional[Headers]
+    ) -> tuple:
+        if starting_after is not None:
+            params = {**params, 'starting_after': starting_after}
+        response = await self.get(URL('/g_business/v1/payments'), params=params, headers=headers)
+        response.raise_for_status()
+        page = loads(response.content)
+        return page.get('data', []), page.get('has_more', False)
+
+    def map(
+        self,
+        func: Callable[[Any], Awaitable[Response]],
+        items: Iterable[Any],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        return async_bounded_map(func, items, concurrency, ordered)
+
+    def create_payments(
+        self,
+        payments: Iterable[dict],
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        return self.map(lambda payment: self.create_payment(**payment), payments, concurrency, ordered)
+
+    def get_payments_details(
+        self,
+        payment_ids: Iterable[str],
+        headers: Optional[Headers] = None,
+        concurrency: int = 10,
+        ordered: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        return self.map(
+            lambda payment_id: self.get_payment_details(payment_id, headers), payment_ids, concurrency, ordered
+        )
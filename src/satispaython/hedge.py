@@ -0,0 +1,89 @@
+import asyncio
+import math
+from collections import deque
+from time import perf_counter
+from typing import Awaitable, Callable, NamedTuple, TypeVar
+
+T = TypeVar('T')
+
+
+class HedgeStats(NamedTuple):
+    requests: int
+    hedged: int
+    hedge_wins: int
+
+
+class HedgePolicy:
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        window: int = 200,
+        min_samples: int = 20,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.01,
+        budget: float = 0.05,
+        max_tokens: float = 10.0
+    ) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self._latencies = deque(maxlen=window)
+        self._tokens = max_tokens
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    @property
+    def delay(self) -> float:
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        latencies = sorted(self._latencies)
+        index = max(math.ceil(self.percentile / 100 * len(latencies)) - 1, 0)
+        return max(latencies[index], self.min_delay)
+
+    def stats(self) -> HedgeStats:
+        return HedgeStats(self._requests, self._hedged, self._hedge_wins)
+
+    def observe(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def _acquire(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self._hedged += 1
+        return True
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        start = perf_counter()
+        result = await call()
+        self.observe(perf_counter() - start)
+        return result
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        self._requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+        first = asyncio.ensure_future(self._timed(call))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay)
+            if not done and self._acquire():
+                tasks.add(asyncio.ensure_future(self._timed(call)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._hedge_wins += 1
+                        return task.result()
+                    if error is None:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
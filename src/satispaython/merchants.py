@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from concurrent.futures import Executor
+from threading import Lock
+from typing import Callable, Optional
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from httpx import URL, AsyncClient, Client, Headers, Response
+
+from .auth import SatispayAuth
+from .client import get_base_url, payment_body, payment_headers
+
+KeyLoader = Callable[[str], RSAPrivateKey]
+
+
+class _AuthCache:
+
+    def __init__(self, key_loader: KeyLoader, max_merchants: int, executor: Optional[Executor] = None) -> None:
+        self._key_loader = key_loader
+        self._max_merchants = max_merchants
+        self._executor = executor
+        self._auths: 'OrderedDict[str, SatispayAuth]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._auths)
+
+    def get(self, key_id: str) -> SatispayAuth:
+        with self._lock:
+            auth = self._auths.get(key_id)
+            if auth is not None:
+                self._auths.move_to_end(key_id)
+                return auth
+        auth = SatispayAuth(key_id, self._key_loader(key_id), self._executor)
+        with self._lock:
+            self._auths[key_id] = auth
+            while len(self._auths) > self._max_merchants:
+                self._auths.popitem(last=False)
+        return auth
+
+    def invalidate(self, key_id: Optional[str] = None) -> None:
+        with self._lock:
+            if key_id is None:
+                self._auths.clear()
+            else:
+                self._auths.pop(key_id, None)
+
+
+class MerchantClient:
+
+    def __init__(self, client: Client, auth: SatispayAuth) -> None:
+        self._client = client
+        self._auth = auth
+
+    @property
+    def key_id(self) -> str:
+        return self._auth._key_id
+
+    def request(self, method: str, url: URL, **kwargs) -> Response:
+        return self._client.request(method, url, auth=self._auth, **kwargs)
+
+    def create_payment(
+        self,
+        amount_unit: int,
+        currency: str,
+        body_params: Optional[dict] = None,
+        headers: Optional[Headers] = None
+    ) -> Response:
+        target = URL('/g_business/v1/payments')
+        headers = payment_headers(headers)
+        body_params = payment_body(amount_unit, currency, body_params)
+        return self.request('POST', target, json=body_params, headers=headers)
+
+    def get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
+        target = URL(f'/g_business/v1/payments/{payment_id}')
+        return self.request('GET', target, headers=headers)
+
+
+class AsyncMerchantClient:
+
+    def __init__(self, client: AsyncClient, auth: SatispayAuth) -> None:
+        self._client = client
+        self._auth = auth
+
+    @property
+    def key_id(self) -> str:
+        return self._auth._key_id
+
+    async def request(self, method: str, url: URL, **kwargs) -> Response:
+        return await self._client.request(method, url, auth=self._auth, **kwargs)
+
+    async def create_payment(
+        self,
+        amount_unit: int,
+        currency: str,
+        body_params: Optional[dict] = None,
+        headers: Optional[Headers] = None
+    ) -> Response:
+        target = URL('/g_business/v1/payments')
+        headers = payment_headers(headers)
+        body_params = payment_body(amount_unit, currency, body_params)
+        return await self.request('POST', target, json=body_params, headers=headers)
+
+    async def get_payment_details(self, payment_id: str, headers: Optional[Headers] = None) -> Response:
+        target = URL(f'/g_business/v1/payments/{payment_id}')
+        return await self.request('GET', target, headers=headers)
+
+
+class MerchantManager:
+
+    def __init__(self, key_loader: KeyLoader, staging: bool = False, max_merchants: int = 128, **kwargs) -> None:
+        headers = Headers(kwargs.pop('headers', None))
+        headers.update({'Accept': 'application/json'})
+        base_url = get_base_url(staging, kwargs.pop('base_url', None))
+        self._client = Client(headers=headers, base_url=base_url, **kwargs)
+        self._auths = _AuthCache(key_loader, max_merchants)
+
+    def __enter__(self) -> 'MerchantManager':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._auths)
+
+    def for_merchant(self, key_id: str) -> MerchantClient:
+        return MerchantClient(self._client, self._auths.get(key_id))
+
+    def forget(self, key_id: Optional[str] = None) -> None:
+        self._auths.invalidate(key_id)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncMerchantManager:
+
+    def __init__(
+        self,
+        key_loader: KeyLoader,
+        staging: bool = False,
+        max_merchants: int = 128,
+        executor: Optional[Executor] = None,
+        **kwargs
+    ) -> None:
+        headers = Headers(kwargs.pop('headers', None))
+        headers.update({'Accept': 'application/json'})
+        base_url = get_base_url(staging, kwargs.pop('base_url', None))
+        self._client = AsyncClient(headers=headers, base_url=base_url, **kwargs)
+        self._auths = _AuthCache(key_loader, max_merchants, executor)
+
+    async def __aenter__(self) -> 'AsyncMerchantManager':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def __len__(self) -> int:
+        return len(self._auths)
+
+    def for_merchant(self, key_id: str) -> AsyncMerchantClient:
+        return AsyncMerchantClient(self._client, self._auths.get(key_id))
+
+    def forget(self, key_id: Optional[str] = None) -> None:
+        self._auths.invalidate(key_id)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
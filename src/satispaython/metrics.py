@@ -0,0 +1,223 @@
+import logging
+from abc import ABC, abstractmethod
+from threading import Lock
+from time import perf_counter
+from typing import Any, NamedTuple, Optional, Union
+
+from httpx import AsyncBaseTransport, BaseTransport
+
+try:
+    from contextvars import ContextVar
+except ModuleNotFoundError:
+    ContextVar = None
+
+try:
+    from httpcore._backends.base import lookup_async_backend, lookup_sync_backend
+except ImportError:
+    lookup_async_backend = lookup_sync_backend = None
+
+PHASES = ('digest', 'compose', 'sign', 'connect', 'ttfb', 'total')
+
+
+class RequestTimings:
+    __slots__ = ('method', 'path', 'status_code') + PHASES
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.status_code = None
+        self.digest = None
+        self.compose = None
+        self.sign = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+
+    def __repr__(self) -> str:
+        phases = ', '.join(f'{phase}={getattr(self, phase)!r}' for phase in PHASES)
+        return f'RequestTimings(method={self.method!r}, path={self.path!r}, status_code={self.status_code!r}, {phases})'
+
+
+if ContextVar is None:
+    def current_timings() -> Optional[RequestTimings]:
+        return None
+
+    def _set_timings(timings: Optional[RequestTimings]) -> Any:
+        return None
+
+    def _reset_timings(token: Any) -> None:
+        pass
+else:
+    _current_timings = ContextVar('satispaython_timings', default=None)
+
+    def current_timings() -> Optional[RequestTimings]:
+        return _current_timings.get()
+
+    _set_timings = _current_timings.set
+    _reset_timings = _current_timings.reset
+
+
+class MetricsHook(ABC):
+
+    @abstractmethod
+    def on_request(self, timings: RequestTimings) -> None:
+        raise NotImplementedError
+
+
+class LoggingHook(MetricsHook):
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+        self._logger = logger or logging.getLogger('satispaython')
+        self._level = level
+
+    def on_request(self, timings: RequestTimings) -> None:
+        if not self._logger.isEnabledFor(self._level):
+            return
+        phases = ' '.join(
+            f'{phase}={value * 1000:.3f}ms' for phase, value in ((phase, getattr(timings, phase)) for phase in PHASES)
+            if value is not None
+        )
+        self._logger.log(self._level, '%s %s %s %s', timings.method, timings.path, timings.status_code, phases)
+
+
+class PrometheusHook(MetricsHook):
+
+    def __init__(self, registry: Any = None, namespace: str = 'satispaython', buckets: Optional[tuple] = None) -> None:
+        try:
+            from prometheus_client import REGISTRY, Histogram
+        except ModuleNotFoundError:
+            raise ImportError('PrometheusHook requires prometheus_client: pip install prometheus-client') from None
+        kwargs = {} if buckets is None else {'buckets': buckets}
+        self._histogram = Histogram(
+            'request_phase_seconds',
+            'Time spent in each phase of a Satispay API request',
+            ['method', 'phase'],
+            namespace=namespace,
+            registry=REGISTRY if registry is None else registry,
+            **kwargs
+        )
+
+    def on_request(self, timings: RequestTimings) -> None:
+        for phase in PHASES:
+            value = getattr(timings, phase)
+            if value is not None:
+                self._histogram.labels(timings.method, phase).observe(value)
+
+
+class ConnectionStats(NamedTuple):
+    requests: int
+    reused: int
+    opened: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+
+class _TimingSyncBackend:
+
+    def __init__(self) -> None:
+        self._backend = lookup_sync_backend('sync')
+        self._lock = Lock()
+        self.opened = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._backend, name)
+
+    def open_tcp_stream(self, *args, **kwargs) -> Any:
+        start = perf_counter()
+        try:
+            stream = self._backend.open_tcp_stream(*args, **kwargs)
+        finally:
+            _add_connect_time(perf_counter() - start)
+        with self._lock:
+            self.opened += 1
+        return stream
+
+
+class _TimingAsyncBackend:
+
+    def __init__(self) -> None:
+        self._backend = lookup_async_backend('auto')
+        self.opened = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._backend, name)
+
+    async def open_tcp_stream(self, *args, **kwargs) -> Any:
+        start = perf_counter()
+        try:
+            stream = await self._backend.open_tcp_stream(*args, **kwargs)
+        finally:
+            _add_connect_time(perf_counter() - start)
+        self.opened += 1
+        return stream
+
+
+class _ConnectionTracker(MetricsHook):
+
+    def __init__(self, backend: Union[_TimingSyncBackend, _TimingAsyncBackend]) -> None:
+        self._backend = backend
+        self._lock = Lock()
+        self._requests = 0
+        self._reused = 0
+
+    def on_request(self, timings: RequestTimings) -> None:
+        with self._lock:
+            self._requests += 1
+            if timings.connect is None:
+                self._reused += 1
+
+    def stats(self) -> ConnectionStats:
+        return ConnectionStats(self._requests, self._reused, self._backend.opened)
+
+
+def _add_connect_time(elapsed: float) -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.connect = (timings.connect or 0.0) + elapsed
+
+
+class TimingTransport(BaseTransport):
+
+    def __init__(self, transport: BaseTransport) -> None:
+        self._transport = transport
+
+    def handle_request(self, *args, **kwargs) -> Any:
+        timings = current_timings()
+        if timings is None:
+            return self._transport.handle_request(*args, **kwargs)
+        start = perf_counter()
+        response = self._transport.handle_request(*args, **kwargs)
+        timings.ttfb = perf_counter() - start
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncTimingTransport(AsyncBaseTransport):
+
+    def __init__(self, transport: AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, *args, **kwargs) -> Any:
+        timings = current_timings()
+        if timings is None:
+            return await self._transport.handle_async_request(*args, **kwargs)
+        start = perf_counter()
+        response = await self._transport.handle_async_request(*args, **kwargs)
+        timings.ttfb = perf_counter() - start
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _timing_sync_backend() -> Optional[_TimingSyncBackend]:
+    return None if lookup_sync_backend is None else _TimingSyncBackend()
+
+
+def _timing_async_backend() -> Optional[_TimingAsyncBackend]:
+    return None if lookup_async_backend is None else _TimingAsyncBackend()
+
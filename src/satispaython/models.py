@@ -0,0 +1,122 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional, Union
+
+from httpx import Response
+
+from .utils.utils import parse_datetime
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+PENDING = 'PENDING'
+AUTHORIZED = 'AUTHORIZED'
+ACCEPTED = 'ACCEPTED'
+CANCELED = 'CANCELED'
+
+TERMINAL_STATUSES = frozenset({ACCEPTED, CANCELED})
+
+ACCEPT = 'ACCEPT'
+CANCEL = 'CANCEL'
+CANCEL_OR_REFUND = 'CANCEL_OR_REFUND'
+
+PAYMENT_FIELDS = (
+    'id', 'code_identifier', 'type', 'amount_unit', 'currency', 'status', 'expired', 'metadata',
+    'sender', 'receiver', 'insert_date', 'expire_date', 'external_code', 'redirect_url'
+)
+
+_FIELD_INDEX = {name: index for index, name in enumerate(PAYMENT_FIELDS)}
+
+
+def _field(name: str) -> property:
+    index = _FIELD_INDEX[name]
+    return property(lambda self: self._load()[index])
+
+
+def _date_field(name: str) -> property:
+    index = _FIELD_INDEX[name]
+
+    def getter(self) -> Optional[datetime]:
+        value = self._load()[index]
+        return None if value is None else parse_datetime(value)
+
+    return property(getter)
+
+
+class Payment:
+    __slots__ = ('_raw', '_values', '_extra')
+
+    def __init__(self, raw: Union[bytes, str]) -> None:
+        self._raw = raw
+        self._values: Optional[tuple] = None
+        self._extra: Optional[dict] = None
+
+    @classmethod
+    def from_response(cls, response: Response) -> 'Payment':
+        return cls(response.content)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Payment':
+        payment = cls(b'')
+        payment._unpack(data)
+        return payment
+
+    def __repr__(self) -> str:
+        return f'Payment(id={self.id!r}, status={self.status!r})'
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Payment):
+            return NotImplemented
+        return self._load() == other._load() and self._extra == other._extra
+
+    def _load(self) -> tuple:
+        if self._values is None:
+            self._unpack(loads(self._raw))
+        return self._values
+
+    def _unpack(self, data: dict) -> None:
+        self._values = tuple(data.get(name) for name in PAYMENT_FIELDS)
+        if not data.keys() <= _FIELD_INDEX.keys():
+            self._extra = {name: value for name, value in data.items() if name not in _FIELD_INDEX}
+        self._raw = None
+
+    id = _field('id')
+    code_identifier = _field('code_identifier')
+    type = _field('type')
+    amount_unit = _field('amount_unit')
+    currency = _field('currency')
+    status = _field('status')
+    expired = _field('expired')
+    metadata = _field('metadata')
+    sender = _field('sender')
+    receiver = _field('receiver')
+    external_code = _field('external_code')
+    redirect_url = _field('redirect_url')
+    insert_date = _date_field('insert_date')
+    expire_date = _date_field('expire_date')
+
+    @property
+    def amount(self) -> Optional[Decimal]:
+        amount_unit = self.amount_unit
+        return None if amount_unit is None else Decimal(amount_unit).scaleb(-2)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def get(self, name: str, default: Any = None) -> Any:
+        index = _FIELD_INDEX.get(name)
+        if index is not None:
+            value = self._load()[index]
+        else:
+            self._load()
+            value = None if self._extra is None else self._extra.get(name)
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        data = {name: value for name, value in zip(PAYMENT_FIELDS, self._load()) if value is not None}
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
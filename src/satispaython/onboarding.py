@@ -0,0 +1,104 @@
+import asyncio
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from os import PathLike
+from pathlib import Path
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from cryptography.hazmat.primitives.serialization import (
+    Encoding, NoEncryption, PrivateFormat, load_pem_private_key
+)
+from httpx import AsyncClient, Headers
+
+from .auth import SatispayAuth
+from .batch import async_bounded_results
+from .client import authentication_key_body, get_base_url
+from .utils import write_key
+
+
+_SAFE_NAME = re.compile(r'[A-Za-z0-9_-]+')
+
+
+class ProvisioningResult(NamedTuple):
+    token: str
+    key_id: Optional[str] = None
+    key_path: Optional[Path] = None
+    error: Optional[Exception] = None
+
+
+def _generate_pem(key_size: int) -> bytes:
+    rsa_key = generate_private_key(65537, key_size)
+    return rsa_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+
+
+def _key_path(key_dir: Path, name: str) -> Path:
+    if not isinstance(name, str) or not _SAFE_NAME.fullmatch(name):
+        raise ValueError(f'{name!r} cannot be used as a key file name')
+    return key_dir / f'{name}.pem'
+
+
+class _Provisioner:
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        executor: Executor,
+        key_dir: Path,
+        password: Optional[str],
+        key_size: int
+    ) -> None:
+        self._client = client
+        self._executor = executor
+        self._key_dir = key_dir
+        self._password = password
+        self._key_size = key_size
+
+    async def __call__(self, token: str) -> ProvisioningResult:
+        key_path = None
+        try:
+            loop = asyncio.get_event_loop()
+            token_path = _key_path(self._key_dir, token)
+            pem = await loop.run_in_executor(self._executor, _generate_pem, self._key_size)
+            rsa_key = load_pem_private_key(pem, None)
+            key_path = token_path
+            await loop.run_in_executor(None, write_key, rsa_key, key_path, self._password)
+            target = '/g_business/v1/authentication_keys'
+            body = authentication_key_body(token, rsa_key)
+            response = await self._client.post(target, json=body, auth=SatispayAuth('PLACEHOLDER', rsa_key))
+            response.raise_for_status()
+            key_id = response.json()['key_id']
+            final_path = _key_path(self._key_dir, key_id)
+            os.replace(key_path, final_path)
+            return ProvisioningResult(token, key_id, final_path)
+        except Exception as error:
+            return ProvisioningResult(token, key_path=key_path, error=error)
+
+
+async def provision_merchants(
+    tokens: Iterable[str],
+    key_dir: PathLike,
+    password: Optional[str] = None,
+    staging: bool = False,
+    concurrency: int = 10,
+    executor: Optional[Executor] = None,
+    key_size: int = 4096,
+    **kwargs
+) -> AsyncIterator[ProvisioningResult]:
+    key_dir = Path(key_dir)
+    key_dir.mkdir(parents=True, exist_ok=True)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor()
+    headers = Headers(kwargs.pop('headers', None))
+    headers.update({'Accept': 'application/json'})
+    base_url = get_base_url(staging, kwargs.pop('base_url', None))
+    try:
+        async with AsyncClient(headers=headers, base_url=base_url, **kwargs) as client:
+            provisioner = _Provisioner(client, executor, key_dir, password, key_size)
+            async for result in async_bounded_results(provisioner, tokens, concurrency):
+                yield result
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
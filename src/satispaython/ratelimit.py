@@ -0,0 +1,145 @@
+import asyncio
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+from httpx import Request, Response
+
+from .retry import parse_retry_after
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_STATE = struct.Struct('d')
+
+
+class RateLimitBackend(ABC):
+
+    @abstractmethod
+    def reserve(self, key: str, interval: float, tolerance: float) -> float:
+        raise NotImplementedError
+
+    @abstractmethod
+    def block(self, key: str, delay: float, tolerance: float) -> None:
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+
+    def __init__(self) -> None:
+        self._arrivals: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def reserve(self, key: str, interval: float, tolerance: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            arrival = max(self._arrivals.get(key, now), now)
+            self._arrivals[key] = arrival + interval
+        return max(arrival - tolerance - now, 0.0)
+
+    def block(self, key: str, delay: float, tolerance: float) -> None:
+        with self._lock:
+            arrival = time.monotonic() + delay + tolerance
+            self._arrivals[key] = max(self._arrivals.get(key, arrival), arrival)
+
+
+class FileRateLimitBackend(RateLimitBackend):
+
+    def __init__(self, directory: Union[str, PathLike]) -> None:
+        if fcntl is None:
+            raise RuntimeError('FileRateLimitBackend requires fcntl, which is not available on this platform')
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / (sha256(key.encode()).hexdigest()[:32] + '.bucket')
+
+    def _update(self, key: str, update: Callable[[float, float], float]) -> float:
+        fd = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            state = os.pread(fd, _STATE.size, 0)
+            arrival = _STATE.unpack(state)[0] if len(state) == _STATE.size else now
+            os.pwrite(fd, _STATE.pack(update(arrival, now)), 0)
+            return now
+        finally:
+            os.close(fd)
+
+    def reserve(self, key: str, interval: float, tolerance: float) -> float:
+        reserved = []
+
+        def update(arrival: float, now: float) -> float:
+            arrival = max(arrival, now)
+            reserved.append(arrival)
+            return arrival + interval
+
+        now = self._update(key, update)
+        return max(reserved[0] - tolerance - now, 0.0)
+
+    def block(self, key: str, delay: float, tolerance: float) -> None:
+        self._update(key, lambda arrival, now: max(arrival, now + delay + tolerance))
+
+
+class RateLimiter:
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        backend: Optional[RateLimitBackend] = None,
+        default_retry_after: float = 1.0,
+        max_retry_after: float = 60.0
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self._interval = 1 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._backend = MemoryRateLimitBackend() if backend is None else backend
+        self.throttled = 0
+
+    def reserve(self, key: str) -> float:
+        return self._backend.reserve(key, self._interval, self._tolerance)
+
+    def get_retry_after(self, response: Response) -> float:
+        delay = parse_retry_after(response)
+        if delay is None:
+            return self.default_retry_after
+        return min(delay, self.max_retry_after)
+
+    def observe(self, key: str, response: Response) -> None:
+        if response.status_code == 429:
+            self.throttled += 1
+            self._backend.block(key, self.get_retry_after(response), self._tolerance)
+
+    def send(self, key: str, send: Callable[..., Response], request: Request, **kwargs) -> Response:
+        delay = self.reserve(key)
+        if delay > 0:
+            time.sleep(delay)
+        response = send(request, **kwargs)
+        self.observe(key, response)
+        return response
+
+    async def async_send(
+        self,
+        key: str,
+        send: Callable[..., Awaitable[Response]],
+        request: Request,
+        **kwargs
+    ) -> Response:
+        delay = self.reserve(key)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await send(request, **kwargs)
+        self.observe(key, response)
+        return response
@@ -0,0 +1,106 @@
+import atexit
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterator, Optional, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from httpx import Limits
+
+from .client import SatispayClient
+
+
+class _Entry:
+    __slots__ = ('client', 'rsa_key', 'public_numbers', 'in_use', 'last_used', 'retired')
+
+    def __init__(self, client: SatispayClient, rsa_key: RSAPrivateKey) -> None:
+        self.client = client
+        self.rsa_key = rsa_key
+        self.public_numbers = rsa_key.public_key().public_numbers()
+        self.in_use = 0
+        self.last_used = monotonic()
+        self.retired = False
+
+    def matches(self, rsa_key: RSAPrivateKey) -> bool:
+        return rsa_key is self.rsa_key or rsa_key.public_key().public_numbers() == self.public_numbers
+
+
+class ClientRegistry:
+
+    def __init__(self, limits: Optional[Limits] = None, idle_timeout: Optional[float] = 300.0, **kwargs) -> None:
+        self._limits = limits
+        self._idle_timeout = idle_timeout
+        self._kwargs = kwargs
+        self._entries: Dict[Tuple[str, bool], _Entry] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @contextmanager
+    def client(self, key_id: str, rsa_key: RSAPrivateKey, staging: bool = False) -> Iterator[SatispayClient]:
+        entry = self._acquire(key_id, rsa_key, staging)
+        try:
+            yield entry.client
+        finally:
+            self._release(entry)
+
+    def close_idle(self) -> None:
+        with self._lock:
+            self._close_idle()
+
+    def close(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            for entry in entries:
+                self._retire(entry)
+
+    def _create_client(self, key_id: str, rsa_key: RSAPrivateKey, staging: bool) -> SatispayClient:
+        kwargs = dict(self._kwargs)
+        if self._limits is not None:
+            kwargs['limits'] = self._limits
+        return SatispayClient(key_id, rsa_key, staging, **kwargs)
+
+    def _acquire(self, key_id: str, rsa_key: RSAPrivateKey, staging: bool) -> _Entry:
+        with self._lock:
+            self._close_idle()
+            key = (key_id, staging)
+            entry = self._entries.get(key)
+            if entry is not None and not entry.matches(rsa_key):
+                del self._entries[key]
+                self._retire(entry)
+                entry = None
+            if entry is None:
+                entry = _Entry(self._create_client(key_id, rsa_key, staging), rsa_key)
+                self._entries[key] = entry
+            entry.in_use += 1
+            return entry
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = monotonic()
+            if entry.retired and not entry.in_use:
+                entry.client.close()
+
+    def _close_idle(self) -> None:
+        if self._idle_timeout is None:
+            return
+        deadline = monotonic() - self._idle_timeout
+        for key, entry in list(self._entries.items()):
+            if not entry.in_use and entry.last_used < deadline:
+                del self._entries[key]
+                self._retire(entry)
+
+    @staticmethod
+    def _retire(entry: _Entry) -> None:
+        entry.retired = True
+        if not entry.in_use:
+            entry.client.close()
+
+
+default_registry = ClientRegistry(
+    limits=Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300.0)
+)
+atexit.register(default_registry.close)
@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, FrozenSet, Optional
+
+from httpx import NetworkError, RemoteProtocolError, Request, Response, TimeoutException
+
+RETRY_EXCEPTIONS = (NetworkError, RemoteProtocolError, TimeoutException)
+
+
+def parse_retry_after(response: Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(delay, 0.0)
+
+
+class Retry:
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        deadline: Optional[float] = 10.0,
+        statuses: Optional[FrozenSet[int]] = None,
+        methods: Optional[FrozenSet[str]] = None
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = self.RETRY_STATUSES if statuses is None else frozenset(statuses)
+        self.methods = self.IDEMPOTENT_METHODS if methods is None else frozenset(methods)
+
+    def is_retryable(self, request: Request) -> bool:
+        return request.method in self.methods or 'Idempotency-Key' in request.headers
+
+    def get_delay(self, attempt: int, started: float, response: Optional[Response] = None) -> Optional[float]:
+        if attempt >= self.attempts:
+            return None
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        retry_after = None if response is None else parse_retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None and time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+    def send(self, send: Callable[..., Response], request: Request, **kwargs) -> Response:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = send(request, **kwargs)
+            except RETRY_EXCEPTIONS:
+                delay = self.get_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in self.statuses:
+                    return response
+                delay = self.get_delay(attempt, started, response)
+                if delay is None:
+                    return response
+                response.close()
+            time.sleep(delay)
+
+    async def async_send(self, send: Callable[..., Awaitable[Response]], request: Request, **kwargs) -> Response:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await send(request, **kwargs)
+            except RETRY_EXCEPTIONS:
+                delay = self.get_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in self.statuses:
+                    return response
+                delay = self.get_delay(attempt, started, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
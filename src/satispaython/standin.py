@@ -0,0 +1,392 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from base64 import b64decode, b64encode
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from .models import ACCEPT, ACCEPTED, AUTHORIZED, CANCEL, CANCEL_OR_REFUND, CANCELED, PENDING
+from .utils import format_datetime
+
+StandInResponse = Tuple[int, List[Tuple[str, str]], bytes]
+
+_SIGNATURE_PARAMETERS = re.compile(r'(\w+)="([^"]*)"')
+_PAYMENT_PATH = re.compile(r'/g_business/v1/payments/([^/?]+)$')
+_FLOWS = frozenset({'MATCH_CODE', 'MATCH_USER', 'REFUND', 'PRE_AUTHORIZED'})
+_ACTIONS = {
+    ACCEPT: (frozenset({AUTHORIZED}), ACCEPTED),
+    CANCEL: (frozenset({PENDING, AUTHORIZED}), CANCELED),
+    CANCEL_OR_REFUND: (frozenset({PENDING, AUTHORIZED}), CANCELED),
+}
+
+
+class StandInError(Exception):
+
+    def __init__(self, status_code: int, code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+class StandInSatispay:
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        tokens: Optional[Iterable[str]] = None,
+        seed: Optional[int] = None
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._tokens = None if tokens is None else set(tokens)
+        self._used_tokens = set()
+        self._random = random.Random(seed)
+        self._keys: Dict[str, RSAPublicKey] = {}
+        self._payments: Dict[str, dict] = {}
+        self._idempotency_keys: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._payments)
+
+    def register_key(self, key_id: str, public_key: RSAPublicKey) -> None:
+        self._keys[key_id] = public_key
+
+    def get_payment(self, payment_id: str) -> Optional[dict]:
+        payment = self._payments.get(payment_id)
+        return None if payment is None else _public(payment)
+
+    def set_status(self, payment_id: str, status: str) -> None:
+        with self._lock:
+            self._payments[payment_id]['status'] = status
+
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def handle(self, method: str, target: str, headers: Mapping[str, str], body: bytes) -> StandInResponse:
+        headers = {name.lower(): value for name, value in headers.items()}
+        try:
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise StandInError(self.error_status, 500, 'Injected error')
+            status_code, content = self._route(method.upper(), target, headers, body)
+        except StandInError as error:
+            status_code, content = error.status_code, {'code': error.code, 'message': error.message}
+        body = json.dumps(content).encode()
+        return status_code, [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))], body
+
+    def _route(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, dict]:
+        url = urlsplit(target)
+        path = url.path
+        if path == '/g_business/v1/authentication_keys' and method == 'POST':
+            return self._create_authentication_key(method, target, headers, body)
+        key_id = self._verify(method, target, headers, body)
+        if path == '/wally-services/protocol/tests/signature' and method == 'POST':
+            return 200, self._describe_signature(key_id, method, target, headers)
+        if path == '/g_business/v1/payments':
+            if method == 'POST':
+                return self._create_payment(key_id, headers, body)
+            if method == 'GET':
+                return 200, self._list_payments(key_id, parse_qs(url.query))
+        match = _PAYMENT_PATH.match(path)
+        if match is not None and method == 'GET':
+            return 200, self._payment(key_id, match.group(1))
+        if match is not None and method == 'PUT':
+            return 200, self._update_payment(key_id, match.group(1), body)
+        raise StandInError(404, 404, f'No route for {method} {path}')
+
+    def _verify(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes,
+        public_key: Optional[RSAPublicKey] = None
+    ) -> str:
+        parameters = dict(_SIGNATURE_PARAMETERS.findall(headers.get('authorization', '')))
+        key_id = parameters.get('keyId')
+        if public_key is None:
+            public_key = self._keys.get(key_id)
+        if public_key is None or parameters.get('algorithm') != 'rsa-sha256':
+            raise StandInError(401, 34, 'Unknown key or algorithm')
+        digest = 'SHA-256=' + b64encode(sha256(body).digest()).decode()
+        if headers.get('digest') != digest:
+            raise StandInError(401, 34, 'Invalid digest')
+        string = self._signing_string(parameters.get('headers', 'date').split(), method, target, headers)
+        try:
+            public_key.verify(b64decode(parameters.get('signature', '')), string.encode(), PKCS1v15(), SHA256())
+        except (InvalidSignature, ValueError):
+            raise StandInError(401, 34, 'Invalid signature')
+        return key_id
+
+    @staticmethod
+    def _signing_string(names: List[str], method: str, target: str, headers: Dict[str, str]) -> str:
+        lines = []
+        for name in names:
+            if name == '(request-target)':
+                lines.append(f'(request-target): {method.lower()} {target}')
+            else:
+                lines.append(f'{name}: {headers.get(name, "")}')
+        return '\n'.join(lines)
+
+    def _create_authentication_key(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> Tuple[int, dict]:
+        content = _loads(body)
+        token = content.get('token')
+        try:
+            public_key = load_pem_public_key(content.get('public_key', '').encode())
+        except ValueError:
+            raise StandInError(400, 20, 'Invalid public key')
+        self._verify(method, target, headers, body, public_key)
+        with self._lock:
+            if token in self._used_tokens or (self._tokens is not None and token not in self._tokens):
+                raise StandInError(403, 45, 'Invalid activation code')
+            self._used_tokens.add(token)
+            key_id = uuid.uuid4().hex
+            self._keys[key_id] = public_key
+        return 200, {'key_id': key_id}
+
+    def _describe_signature(self, key_id: str, method: str, target: str, headers: Dict[str, str]) -> dict:
+        parameters = dict(_SIGNATURE_PARAMETERS.findall(headers['authorization']))
+        names = parameters['headers'].split()
+        return {
+            'authentication_key': {'access_key': key_id, 'role': 'ONLINE_SHOP', 'enable': True},
+            'signature': {
+                'key_id': key_id,
+                'algorithm': parameters['algorithm'],
+                'headers': names,
+                'signature': parameters['signature'],
+                'valid': True
+            },
+            'signed_string': self._signing_string(names, method, target, headers)
+        }
+
+    def _create_payment(self, key_id: str, headers: Dict[str, str], body: bytes) -> Tuple[int, dict]:
+        content = _loads(body)
+        amount_unit = content.get('amount_unit')
+        if content.get('flow') not in _FLOWS or not isinstance(amount_unit, int) or amount_unit < 0:
+            raise StandInError(400, 20, 'Invalid flow or amount_unit')
+        if not isinstance(content.get('currency'), str):
+            raise StandInError(400, 20, 'Invalid currency')
+        idempotency_key = headers.get('idempotency-key')
+        with self._lock:
+            payment_id = self._idempotency_keys.get((key_id, idempotency_key))
+            if payment_id is not None:
+                return 200, _public(self._payments[payment_id])
+            now = datetime.now(timezone.utc)
+            payment_id = str(uuid.uuid4())
+            payment = {
+                'id': payment_id,
+                'code_identifier': 'S6Y-PAY--' + payment_id[:8].upper(),
+                'type': 'TO_BUSINESS',
+                'amount_unit': amount_unit,
+                'currency': content['currency'],
+                'status': PENDING,
+                'expired': False,
+                'metadata': content.get('metadata', {}),
+                'sender': {'type': 'CONSUMER'},
+                'receiver': {'id': key_id, 'type': 'SHOP'},
+                'insert_date': format_datetime(now),
+                'expire_date': content.get('expiration_date') or format_datetime(now + timedelta(minutes=5)),
+                'external_code': content.get('external_code'),
+                'key_id': key_id
+            }
+            self._payments[payment_id] = payment
+            if idempotency_key is not None:
+                self._idempotency_keys[(key_id, idempotency_key)] = payment_id
+        return 200, _public(payment)
+
+    def _payment(self, key_id: str, payment_id: str) -> dict:
+        payment = self._payments.get(payment_id)
+        if payment is None or payment['key_id'] != key_id:
+            raise StandInError(404, 41, 'Payment not found')
+        return _public(payment)
+
+    def _update_payment(self, key_id: str, payment_id: str, body: bytes) -> dict:
+        content = _loads(body)
+        action = content.get('action')
+        if action not in _ACTIONS:
+            raise StandInError(400, 20, 'Invalid action')
+        statuses, status = _ACTIONS[action]
+        with self._lock:
+            payment = self._payments.get(payment_id)
+            if payment is None or payment['key_id'] != key_id:
+                raise StandInError(404, 41, 'Payment not found')
+            if payment['status'] not in statuses:
+                raise StandInError(400, 20, f'Cannot {action} a payment with status {payment["status"]}')
+            payment['status'] = status
+            if isinstance(content.get('metadata'), dict):
+                payment['metadata'] = content['metadata']
+            return _public(payment)
+
+    def _list_payments(self, key_id: str, query: Dict[str, List[str]]) -> dict:
+        status = query.get('status', [None])[0]
+        starting_after = query.get('starting_after', [None])[0]
+        since = query.get('starting_after_timestamp', [None])[0]
+        limit = min(max(int(query.get('limit', ['20'])[0]), 1), 100)
+        with self._lock:
+            payments = list(self._payments.values())
+        data, skipping = [], starting_after is not None
+        for payment in reversed(payments):
+            if skipping:
+                skipping = payment['id'] != starting_after
+                continue
+            if payment['key_id'] != key_id or (status is not None and payment['status'] != status):
+                continue
+            if since is not None and payment['insert_date'] < since:
+                continue
+            if len(data) == limit:
+                return {'has_more': True, 'data': data}
+            data.append(_public(payment))
+        return {'has_more': False, 'data': data}
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            return
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        target = scope.get('raw_path', b'').decode() or quote(scope['path'])
+        if scope.get('query_string'):
+            target += '?' + scope['query_string'].decode()
+        headers = {name.decode(): value.decode() for name, value in scope['headers']}
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        status_code, response_headers, content = self.handle(scope['method'], target, headers, body)
+        await send({
+            'type': 'http.response.start',
+            'status': status_code,
+            'headers': [(name.encode(), value.encode()) for name, value in response_headers]
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    def wsgi(self, environ: dict, start_response: Callable) -> List[bytes]:
+        target = quote(environ.get('PATH_INFO', '/'))
+        if environ.get('QUERY_STRING'):
+            target += '?' + environ['QUERY_STRING']
+        headers = {name[5:].replace('_', '-'): value for name, value in environ.items() if name.startswith('HTTP_')}
+        if environ.get('CONTENT_TYPE'):
+            headers['content-type'] = environ['CONTENT_TYPE']
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length) if length else b''
+        delay = self.delay()
+        if delay:
+            time.sleep(delay)
+        status_code, response_headers, content = self.handle(environ['REQUEST_METHOD'], target, headers, body)
+        start_response(f'{status_code} {_REASONS.get(status_code, "Error")}', response_headers)
+        return [content]
+
+    def serve(self, host: str = '127.0.0.1', port: int = 0) -> 'StandInServer':
+        return StandInServer(self, host, port)
+
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable', 504: 'Gateway Timeout'
+}
+
+
+def _loads(body: bytes) -> dict:
+    try:
+        content = json.loads(body)
+    except ValueError:
+        raise StandInError(400, 20, 'Invalid JSON body')
+    if not isinstance(content, dict):
+        raise StandInError(400, 20, 'Invalid JSON body')
+    return content
+
+
+def _public(payment: dict) -> dict:
+    return {name: value for name, value in payment.items() if name != 'key_id'}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self) -> None:
+        standin = self.server.standin
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        delay = standin.delay()
+        if delay:
+            time.sleep(delay)
+        status_code, headers, content = standin.handle(self.command, self.path, dict(self.headers.items()), body)
+        self.send_response(status_code)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StandInServer:
+
+    def __init__(self, standin: StandInSatispay, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.standin = standin
+        self._server = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.standin = standin
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'StandInServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,91 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Callable, List, NamedTuple, Optional
+
+from httpx import Response
+
+from .batch import BatchResult
+from .client import AsyncSatispayClient
+from .models import CANCEL, CANCELED, PENDING, Payment
+from .ratelimit import RateLimiter
+
+
+class SweepReport(NamedTuple):
+    scanned: int
+    stale: int
+    canceled: int
+    errors: Counter
+    elapsed: float
+    dry_run: bool = False
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+
+def format_report(report: SweepReport) -> str:
+    lines = [
+        f'scanned     {report.scanned} pending payments in {report.elapsed:.2f} s',
+        f'stale       {report.stale}' + (' (dry run, nothing canceled)' if report.dry_run else ''),
+        f'canceled    {report.canceled}',
+    ]
+    if report.errors:
+        errors = ', '.join(f'{name}: {count}' for name, count in report.errors.most_common())
+        lines.append(f'failed      {report.failed} ({errors})')
+    else:
+        lines.append('failed      0')
+    return '\n'.join(lines)
+
+
+def _classify(result: BatchResult) -> Optional[str]:
+    if result.error is not None:
+        return type(result.error).__name__
+    if result.response.is_error:
+        return str(result.response.status_code)
+    try:
+        status = Payment.from_response(result.response).status
+    except Exception as error:
+        return type(error).__name__
+    return None if status == CANCELED else status
+
+
+async def cancel_stale_payments(
+    client: AsyncSatispayClient,
+    predicate: Callable[[Payment], bool],
+    max_age: timedelta = timedelta(hours=1),
+    concurrency: int = 10,
+    rate: Optional[float] = 10.0,
+    dry_run: bool = False
+) -> SweepReport:
+    started = perf_counter()
+    cutoff = datetime.now(timezone.utc) - max_age
+    scanned = 0
+    stale: List[str] = []
+    async for payment in client.iter_payments(status=PENDING):
+        scanned += 1
+        insert_date = payment.insert_date
+        if insert_date is None or insert_date > cutoff:
+            continue
+        if predicate(payment):
+            stale.append(payment.id)
+    canceled = 0
+    errors: Counter = Counter()
+    if not dry_run:
+        limiter = None if rate is None else RateLimiter(rate)
+
+        async def cancel(payment_id: str) -> Response:
+            if limiter is not None:
+                delay = limiter.reserve('sweep')
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            return await client.update_payment(payment_id, CANCEL)
+
+        async for result in client.map(cancel, stale, concurrency):
+            error = _classify(result)
+            if error is None:
+                canceled += 1
+            else:
+                errors[error] += 1
+    return SweepReport(scanned, len(stale), canceled, errors, perf_counter() - started, dry_run)
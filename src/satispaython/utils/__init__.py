@@ -1,3 +1,35 @@
-from .utils import format_datetime, generate_key, load_key, write_key
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ['generate_key', 'write_key', 'load_key', 'format_datetime']
+if TYPE_CHECKING:
+    from .keystore import KeyStore
+    from .utils import format_datetime, generate_key, load_key, parse_datetime, write_key
+
+_exports = {
+    'generate_key': 'utils',
+    'write_key': 'utils',
+    'load_key': 'utils',
+    'format_datetime': 'utils',
+    'parse_datetime': 'utils',
+    'KeyStore': 'keystore',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _exports:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{_exports[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
+
+
+if sys.version_info < (3, 7):
+    for _name in __all__:
+        __getattr__(_name)
@@ -0,0 +1,70 @@
+import os
+from os import PathLike
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+
+from .utils import load_key
+
+ReloadCallback = Callable[[str, Optional[RSAPrivateKey], RSAPrivateKey], None]
+
+
+class _Entry(NamedTuple):
+    rsa_key: RSAPrivateKey
+    signature: Tuple[int, int, int, int]
+    checked_at: float
+
+
+def _file_signature(path: str) -> Tuple[int, int, int, int]:
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class KeyStore:
+
+    def __init__(self, check_interval: float = 1.0, on_reload: Optional[ReloadCallback] = None) -> None:
+        self._check_interval = check_interval
+        self._on_reload = on_reload
+        self._entries: Dict[Tuple[str, Optional[str]], _Entry] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: PathLike, password: Optional[str] = None) -> RSAPrivateKey:
+        key = (os.fspath(path), password)
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = monotonic()
+            if now - entry.checked_at < self._check_interval:
+                return entry.rsa_key
+            if _file_signature(key[0]) == entry.signature:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        self._entries[key] = entry._replace(checked_at=now)
+                        return entry.rsa_key
+        return self._load(key)
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.fspath(path)
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def _load(self, key: Tuple[str, Optional[str]]) -> RSAPrivateKey:
+        path, password = key
+        with self._lock:
+            signature = _file_signature(path)
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                return entry.rsa_key
+            rsa_key = load_key(path, password)
+            self._entries[key] = _Entry(rsa_key, signature, monotonic())
+        if entry is not None and self._on_reload is not None:
+            self._on_reload(path, entry.rsa_key, rsa_key)
+        return rsa_key
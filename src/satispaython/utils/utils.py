@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from contextlib import suppress
 from os import PathLike
 from typing import Optional
@@ -35,3 +35,7 @@ def load_key(path: PathLike, password: Optional[str] = None) -> RSAPrivateKey:
 
 def format_datetime(date: datetime) -> str:
     return date.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def parse_datetime(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
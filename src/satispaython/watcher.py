@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .client import AsyncSatispayClient
+from .models import TERMINAL_STATUSES
+
+StatusCallback = Callable[[str, dict], Union[None, Awaitable[None]]]
+
+
+class _Watch:
+    __slots__ = ('payment_id', 'future', 'callback', 'started_at', 'expires_at', 'status', 'payment')
+
+    def __init__(self, payment_id: str, future: asyncio.Future, callback: Optional[StatusCallback],
+                 started_at: float, expires_at: Optional[float]) -> None:
+        self.payment_id = payment_id
+        self.future = future
+        self.callback = callback
+        self.started_at = started_at
+        self.expires_at = expires_at
+        self.status = None
+        self.payment = None
+
+
+class PaymentWatcher:
+
+    def __init__(
+        self,
+        client: AsyncSatispayClient,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        backoff: float = 0.1,
+        timeout: Optional[float] = 3600.0,
+        concurrency: int = 10,
+        on_change: Optional[StatusCallback] = None
+    ) -> None:
+        self._client = client
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._timeout = timeout
+        self._on_change = on_change
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._watches: Dict[str, _Watch] = {}
+        self._heap: List[Any] = []
+        self._counter = 0
+        self._wakeup = asyncio.Event()
+        self._scheduler: Optional[asyncio.Future] = None
+        self._polls = set()
+
+    async def __aenter__(self) -> 'PaymentWatcher':
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def __len__(self) -> int:
+        return len(self._watches)
+
+    def __contains__(self, payment_id: str) -> bool:
+        return payment_id in self._watches
+
+    def start(self) -> None:
+        if self._scheduler is None:
+            self._scheduler = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        tasks = list(self._polls)
+        if self._scheduler is not None:
+            tasks.append(self._scheduler)
+            self._scheduler = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for watch in self._watches.values():
+            watch.future.cancel()
+        self._watches.clear()
+        self._heap.clear()
+
+    def watch(
+        self,
+        payment_id: str,
+        callback: Optional[StatusCallback] = None,
+        timeout: Optional[float] = None
+    ) -> asyncio.Future:
+        watch = self._watches.get(payment_id)
+        if watch is not None:
+            return watch.future
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        timeout = self._timeout if timeout is None else timeout
+        expires_at = None if timeout is None else now + timeout
+        watch = _Watch(payment_id, loop.create_future(), callback, now, expires_at)
+        self._watches[payment_id] = watch
+        watch.future.add_done_callback(lambda future: self._discard(watch))
+        self._schedule(watch, now)
+        self.start()
+        return watch.future
+
+    def unwatch(self, payment_id: str) -> None:
+        watch = self._watches.pop(payment_id, None)
+        if watch is not None:
+            watch.future.cancel()
+
+    def _discard(self, watch: _Watch) -> None:
+        if self._watches.get(watch.payment_id) is watch:
+            del self._watches[watch.payment_id]
+
+    def _interval(self, watch: _Watch, now: float) -> float:
+        interval = (now - watch.started_at) * self._backoff
+        return min(self._max_interval, max(self._min_interval, interval))
+
+    def _schedule(self, watch: _Watch, due: float) -> None:
+        if watch.expires_at is not None:
+            due = min(due, watch.expires_at)
+        self._counter += 1
+        heapq.heappush(self._heap, (due, self._counter, watch))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            due, _, watch = self._heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            if self._watches.get(watch.payment_id) is not watch:
+                continue
+            await self._semaphore.acquire()
+            poll = asyncio.ensure_future(self._poll(watch))
+            self._polls.add(poll)
+            poll.add_done_callback(self._polls.discard)
+
+    async def _poll(self, watch: _Watch) -> None:
+        try:
+            await self._check(watch)
+        finally:
+            self._semaphore.release()
+
+    async def _check(self, watch: _Watch) -> None:
+        loop = asyncio.get_event_loop()
+        try:
+            response = await self._client.get_payment_details(watch.payment_id)
+            payment = None if response.is_error else response.json()
+        except Exception:
+            payment = None
+        if self._watches.get(watch.payment_id) is not watch:
+            return
+        if payment is not None:
+            watch.payment = payment
+            status = payment.get('status')
+            if status != watch.status:
+                watch.status = status
+                await self._notify(watch, payment)
+            if status in TERMINAL_STATUSES or payment.get('expired'):
+                self._finish(watch)
+                return
+        now = loop.time()
+        if watch.expires_at is not None and now >= watch.expires_at:
+            self._finish(watch, asyncio.TimeoutError(f'payment {watch.payment_id} is still {watch.status}'))
+            return
+        self._schedule(watch, now + self._interval(watch, now))
+
+    async def _notify(self, watch: _Watch, payment: dict) -> None:
+        for callback in (self._on_change, watch.callback):
+            if callback is None:
+                continue
+            try:
+                result = callback(watch.payment_id, payment)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as error:
+                asyncio.get_event_loop().call_exception_handler({
+                    'message': f'Exception in status callback for payment {watch.payment_id}',
+                    'exception': error,
+                })
+
+    def _finish(self, watch: _Watch, error: Optional[Exception] = None) -> None:
+        self._discard(watch)
+        if watch.future.done():
+            return
+        if error is None:
+            watch.future.set_result(watch.payment)
+        else:
+            watch.future.set_exception(error)
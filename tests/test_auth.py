@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import httpx
+import pytest
+from pytest import mark
+
+from satispaython import SatispayAuth
+
+URL = 'https://staging.authservices.satispay.com/wally-services/protocol/tests/signature'
+
+
+def _signed_headers(auth, request):
+    flow = auth.sync_auth_flow(request)
+    return next(flow).headers
+
+
+async def _async_signed_headers(auth, request):
+    flow = auth.async_auth_flow(request)
+    request = await flow.__anext__()
+    await flow.aclose()
+    return request.headers
+
+
+class TestAsyncAuthFlow:
+
+    @pytest.mark.asyncio
+    @mark.freeze_time('Mon, 18 Mar 2019 15:10:24 +0000')
+    async def test_default_executor(self, rsa_key):
+        auth = SatispayAuth('key_id', rsa_key)
+        expected = _signed_headers(auth, httpx.Request('POST', URL, json={'a': 1}))
+        headers = await _async_signed_headers(auth, httpx.Request('POST', URL, json={'a': 1}))
+        for name in ('Host', 'Date', 'Digest', 'Authorization'):
+            assert headers[name] == expected[name]
+
+    @pytest.mark.asyncio
+    @mark.freeze_time('Mon, 18 Mar 2019 15:10:24 +0000')
+    async def test_thread_pool_executor(self, rsa_key):
+        with ThreadPoolExecutor(2) as executor:
+            auth = SatispayAuth('key_id', rsa_key, executor)
+            expected = _signed_headers(auth, httpx.Request('GET', URL))
+            headers = await _async_signed_headers(auth, httpx.Request('GET', URL))
+        assert headers['Authorization'] == expected['Authorization']
+
+    @pytest.mark.asyncio
+    @mark.freeze_time('Mon, 18 Mar 2019 15:10:24 +0000')
+    async def test_process_pool_executor(self, rsa_key):
+        with ProcessPoolExecutor(1) as executor:
+            auth = SatispayAuth('key_id', rsa_key, executor)
+            expected = _signed_headers(auth, httpx.Request('POST', URL, content=b'body'))
+            headers = await _async_signed_headers(auth, httpx.Request('POST', URL, content=b'body'))
+        assert headers['Digest'] == expected['Digest']
+        assert headers['Authorization'] == expected['Authorization']
+
+
+class TestSigningString:
+
+    def test_request_target_includes_query(self):
+        request = httpx.Request('GET', 'https://authservices.satispay.com/g_business/v1/payments?status=ACCEPTED')
+        string = SatispayAuth._compose_string(request, 'authservices.satispay.com', 'date', 'digest')
+        assert string.startswith(b'(request-target): get /g_business/v1/payments?status=ACCEPTED\n')
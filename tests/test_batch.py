@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from pytest import fixture
+
+from satispaython import AsyncSatispayClient, SatispayClient
+
+
+class _Handler:
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _exit(self):
+        with self.lock:
+            self.active -= 1
+
+    @staticmethod
+    def _respond(request):
+        if request.url.path.endswith('/broken'):
+            raise httpx.ConnectError('broken', request=request)
+        if request.method == 'POST':
+            return httpx.Response(200, json={'amount_unit': json.loads(request.content)['amount_unit']})
+        return httpx.Response(200, json={'id': request.url.path.rsplit('/', 1)[-1]})
+
+    def __call__(self, request):
+        self._enter()
+        try:
+            time.sleep(0.01)
+            return self._respond(request)
+        finally:
+            self._exit()
+
+
+class _AsyncHandler(_Handler):
+
+    async def __call__(self, request):
+        self._enter()
+        try:
+            await asyncio.sleep(0.01)
+            return self._respond(request)
+        finally:
+            self._exit()
+
+
+@fixture()
+def payment_ids():
+    return [f'payment_{index}' for index in range(20)] + ['broken']
+
+
+class TestSatispayClient:
+
+    def test_get_payments_details(self, rsa_key, payment_ids):
+        handler = _Handler()
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = list(client.get_payments_details(payment_ids, concurrency=4))
+        assert sorted(result.item for result in results) == sorted(payment_ids)
+        assert 1 < handler.max_active <= 4
+        for result in results:
+            if result.item == 'broken':
+                assert isinstance(result.error, httpx.ConnectError)
+                assert result.response is None
+            else:
+                assert result.error is None
+                assert result.response.json() == {'id': result.item}
+
+    def test_create_payments(self, rsa_key):
+        payments = [{'amount_unit': amount, 'currency': 'EUR'} for amount in range(1, 11)]
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_Handler())) as client:
+            results = list(client.create_payments(payments, concurrency=3))
+        assert len(results) == 10
+        for result in results:
+            assert result.response.json() == {'amount_unit': result.item['amount_unit']}
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_get_payments_details(self, rsa_key, payment_ids):
+        handler = _AsyncHandler()
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = [result async for result in client.get_payments_details(payment_ids, concurrency=4)]
+        assert sorted(result.item for result in results) == sorted(payment_ids)
+        assert 1 < handler.max_active <= 4
+        for result in results:
+            if result.item == 'broken':
+                assert isinstance(result.error, httpx.ConnectError)
+            else:
+                assert result.response.json() == {'id': result.item}
+
+    @pytest.mark.asyncio
+    async def test_create_payments(self, rsa_key):
+        payments = ({'amount_unit': amount, 'currency': 'EUR'} for amount in range(1, 11))
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_AsyncHandler())) as client:
+            results = [result async for result in client.create_payments(payments, concurrency=3)]
+        assert sorted(result.response.json()['amount_unit'] for result in results) == list(range(1, 11))
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_pending(self, rsa_key, payment_ids):
+        handler = _AsyncHandler()
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = client.get_payments_details(payment_ids, concurrency=4)
+            async for _ in results:
+                break
+            await results.aclose()
+            await asyncio.sleep(0.05)
+        assert handler.active == 0
+
+
+class _SlowFirstHandler(_Handler):
+
+    def __call__(self, request):
+        self._enter()
+        try:
+            time.sleep(0.05 if request.url.path.endswith('/payment_0') else 0.001)
+            return self._respond(request)
+        finally:
+            self._exit()
+
+
+class TestMap:
+
+    def test_completion_order(self, rsa_key, payment_ids):
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_SlowFirstHandler())) as client:
+            results = list(client.map(client.get_payment_details, payment_ids[:10], concurrency=4))
+        assert results[0].item != 'payment_0'
+        assert sorted(result.item for result in results) == sorted(payment_ids[:10])
+
+    def test_submission_order(self, rsa_key, payment_ids):
+        handler = _SlowFirstHandler()
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = list(client.map(client.get_payment_details, payment_ids, concurrency=4, ordered=True))
+        assert [result.item for result in results] == payment_ids
+        assert 1 < handler.max_active <= 4
+        assert isinstance(results[-1].error, httpx.ConnectError)
+
+    def test_early_exit(self, rsa_key, payment_ids):
+        handler = _Handler()
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = client.map(client.get_payment_details, payment_ids, concurrency=4, ordered=True)
+            assert next(results).item == 'payment_0'
+            results.close()
+        assert handler.active == 0
+
+    @pytest.mark.parametrize('concurrency', [0, -1])
+    def test_invalid_concurrency(self, rsa_key, concurrency):
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_Handler())) as client:
+            with pytest.raises(ValueError, match='concurrency'):
+                client.map(client.get_payment_details, ['payment_id'], concurrency=concurrency)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('concurrency', [0, -1])
+    async def test_async_invalid_concurrency(self, rsa_key, concurrency):
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(_Handler())) as client:
+            with pytest.raises(ValueError, match='concurrency'):
+                client.get_payments_details(['payment_id'], concurrency=concurrency)
+
+    @pytest.mark.asyncio
+    async def test_async_submission_order(self, rsa_key, payment_ids):
+        async def handler(request):
+            await asyncio.sleep(0.05 if request.url.path.endswith('/payment_0') else 0.001)
+            return _Handler._respond(request)
+
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            results = [result async for result in client.map(client.get_payment_details, payment_ids, ordered=True)]
+        assert [result.item for result in results] == payment_ids
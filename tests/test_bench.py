@@ -0,0 +1,35 @@
+import pytest
+
+from satispaython.__main__ import main
+from satispaython.bench import BenchReport
+
+
+def _run(capsys, *args):
+    assert main(['bench', '--requests', '40', '--concurrency', '4', '--key-size', '1024', '--seed', '1', *args]) == 0
+    return dict(line.split(None, 1) for line in capsys.readouterr().out.splitlines())
+
+
+@pytest.mark.parametrize('mode', ['async', 'threads'])
+def test_bench(capsys, mode):
+    report = _run(capsys, '--mode', mode)
+    assert report['mode'] == mode
+    assert report['requests'].startswith('40 in ')
+    assert report['latency'].startswith('p50 ')
+    assert report['signing'].endswith(' ms per request')
+    assert report['errors'] == '0'
+
+
+def test_bench_errors(capsys):
+    report = _run(capsys, '--mode', 'threads', '--error-rate', '1')
+    assert report['errors'] == '40 (503: 40)'
+
+
+def test_bench_requires_key_with_base_url():
+    with pytest.raises(SystemExit):
+        main(['bench', '--base-url', 'http://127.0.0.1:8000'])
+
+
+def test_percentiles():
+    report = BenchReport('async', 1.0, [float(value) for value in range(100, 0, -1)], None, 0.0)
+    assert (report.percentile(50), report.percentile(99), report.percentile(100)) == (50, 99, 100)
+    assert report.throughput == 100
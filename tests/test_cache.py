@@ -0,0 +1,124 @@
+import time
+
+import httpx
+import pytest
+from pytest import fixture
+
+from satispaython import AsyncSatispayClient, SatispayClient
+from satispaython.cache import CacheBackend, MemoryCache, PaymentCache
+
+
+class _Handler:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, request):
+        self.calls += 1
+        payment_id = request.url.path.rsplit('/', 1)[-1]
+        if payment_id == 'missing':
+            return httpx.Response(404, json={'code': 41})
+        return httpx.Response(200, json={'id': payment_id, 'status': payment_id.upper()})
+
+
+@fixture()
+def handler():
+    return _Handler()
+
+
+class TestMemoryCache:
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(maxsize=2)
+        cache.set('a', b'a')
+        cache.set('b', b'b')
+        assert cache.get('a') == b'a'
+        cache.set('c', b'c')
+        assert cache.get('b') is None
+        assert cache.get('a') == b'a'
+        assert cache.get('c') == b'c'
+        assert len(cache) == 2
+
+    def test_ttl(self):
+        cache = MemoryCache()
+        cache.set('a', b'a', 0.01)
+        cache.set('b', b'b')
+        time.sleep(0.02)
+        assert cache.get('a') is None
+        assert cache.get('b') == b'b'
+
+    def test_delete_and_clear(self):
+        cache = MemoryCache()
+        cache.set('a', b'a')
+        cache.set('b', b'b')
+        cache.delete('a')
+        assert cache.get('a') is None
+        cache.clear()
+        assert len(cache) == 0
+
+
+    def test_backends_implement_the_interface(self):
+        class Incomplete(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestSatispayClient:
+
+    def test_terminal_statuses_are_cached(self, rsa_key, handler):
+        cache = PaymentCache()
+        with SatispayClient('key_id', rsa_key, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            for _ in range(3):
+                response = client.get_payment_details('accepted')
+                assert response.status_code == 200
+                assert response.json() == {'id': 'accepted', 'status': 'ACCEPTED'}
+                response.raise_for_status()
+            client.get_payment_details('canceled')
+            client.get_payment_details('canceled')
+        assert handler.calls == 2
+        assert cache.stats == (3, 2)
+        assert cache.stats.hit_ratio == 0.6
+
+    def test_pending_ttl(self, rsa_key, handler):
+        cache = PaymentCache(ttls={'PENDING': 0.01})
+        with SatispayClient('key_id', rsa_key, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            client.get_payment_details('pending')
+            client.get_payment_details('pending')
+            time.sleep(0.02)
+            client.get_payment_details('pending')
+        assert handler.calls == 2
+
+    def test_errors_are_not_cached(self, rsa_key, handler):
+        cache = PaymentCache()
+        with SatispayClient('key_id', rsa_key, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            assert client.get_payment_details('missing').status_code == 404
+            assert client.get_payment_details('missing').status_code == 404
+        assert handler.calls == 2
+
+    def test_keys_are_scoped(self, rsa_key, handler):
+        cache = PaymentCache()
+        transport = httpx.MockTransport(handler)
+        with SatispayClient('key_id', rsa_key, cache=cache, transport=transport) as client:
+            client.get_payment_details('accepted')
+        with SatispayClient('other_key_id', rsa_key, cache=cache, transport=transport) as client:
+            client.get_payment_details('accepted')
+        with SatispayClient('key_id', rsa_key, True, cache=cache, transport=transport) as client:
+            client.get_payment_details('accepted')
+        assert handler.calls == 3
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_terminal_statuses_are_cached(self, rsa_key, handler):
+        cache = PaymentCache()
+        transport = httpx.MockTransport(handler)
+        async with AsyncSatispayClient('key_id', rsa_key, cache=cache, transport=transport) as client:
+            for _ in range(3):
+                response = await client.get_payment_details('canceled')
+                assert response.json() == {'id': 'canceled', 'status': 'CANCELED'}
+        assert handler.calls == 1
+        assert cache.stats == (2, 1)
@@ -0,0 +1,185 @@
+import asyncio
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient
+from satispaython.callbacks import CallbackReceiver
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, statuses):
+        super().__init__(self.handle)
+        self.statuses = statuses
+        self.requests = []
+
+    def handle(self, request):
+        payment_id = request.url.path.rsplit('/', 1)[-1]
+        self.requests.append(payment_id)
+        status = self.statuses.get(payment_id)
+        if status is None:
+            return httpx.Response(404, json={'code': 41})
+        if isinstance(status, bytes):
+            return httpx.Response(200, content=status)
+        return httpx.Response(200, json={'id': payment_id, 'status': status})
+
+
+async def _call(app, query_string):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/callback', 'query_string': query_string}
+    await app(scope, None, send)
+    return messages[0]['status'], dict(messages[0]['headers'])
+
+
+class _Handler:
+
+    def __init__(self):
+        self.payments = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, payment):
+        await self.release.wait()
+        self.payments.append(payment)
+
+
+@pytest.mark.asyncio
+async def test_burst_is_deduplicated_and_batched(rsa_key):
+    transport = _Transport({'a': 'ACCEPTED', 'b': 'PENDING'})
+    handler = _Handler()
+    async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+        async with CallbackReceiver(client, handler) as receiver:
+            for payment_id in 'aaabab':
+                assert await _call(receiver, f'payment_id={payment_id}'.encode()) == (200, {})
+            await receiver.join()
+            assert sorted(transport.requests) == ['a', 'b']
+            assert sorted(payment.id for payment in handler.payments) == ['a', 'b']
+            assert await _call(receiver, b'payment_id=a') == (200, {})
+            assert await _call(receiver, b'payment_id=b') == (200, {})
+            await receiver.join()
+            assert sorted(transport.requests) == ['a', 'b', 'b']
+            assert receiver.stats() == (8, 5, 0, 3, 0)
+
+
+@pytest.mark.asyncio
+async def test_back_pressure(rsa_key):
+    handler = _Handler()
+    handler.release.clear()
+    transport = _Transport({payment_id: 'PENDING' for payment_id in 'abcd'})
+    async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+        async with CallbackReceiver(client, handler, batch_size=1, max_pending=2, retry_after=5) as receiver:
+            assert (await _call(receiver, b'payment_id=a'))[0] == 200
+            while receiver._queue.qsize():
+                await asyncio.sleep(0.001)
+            assert (await _call(receiver, b'payment_id=b'))[0] == 200
+            assert (await _call(receiver, b'payment_id=c'))[0] == 200
+            assert await _call(receiver, b'payment_id=d') == (503, {b'retry-after': b'5'})
+            handler.release.set()
+            await receiver.join()
+            assert (await _call(receiver, b'payment_id=d'))[0] == 200
+            await receiver.join()
+    assert [payment.id for payment in handler.payments] == ['a', 'b', 'c', 'd']
+    assert receiver.stats().rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_errors(rsa_key):
+    exceptions = []
+    asyncio.get_event_loop().set_exception_handler(lambda loop, context: exceptions.append(context))
+
+    async def handler(payment):
+        raise ValueError(payment.id)
+
+    async with AsyncSatispayClient('key_id', rsa_key, transport=_Transport({'a': 'ACCEPTED'})) as client:
+        async with CallbackReceiver(client, handler) as receiver:
+            assert (await _call(receiver, b''))[0] == 400
+            await _call(receiver, b'payment_id=a')
+            await _call(receiver, b'payment_id=missing')
+            await receiver.join()
+    assert receiver.stats() == (2, 0, 0, 1, 1)
+    messages = sorted(context['message'] for context in exceptions)
+    assert messages == [
+        'Exception in callback handler for payment a',
+        'Failed to resolve callback for payment missing'
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_body_does_not_stop_the_worker(rsa_key):
+    exceptions = []
+    asyncio.get_event_loop().set_exception_handler(lambda loop, context: exceptions.append(context))
+    handler = _Handler()
+    transport = _Transport({'garbled': b'<html>', 'a': 'ACCEPTED'})
+    async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+        async with CallbackReceiver(client, handler, batch_delay=0) as receiver:
+            await _call(receiver, b'payment_id=garbled')
+            await receiver.join()
+            await _call(receiver, b'payment_id=a')
+            await receiver.join()
+            assert not receiver._worker.done()
+    assert [payment.id for payment in handler.payments] == ['a']
+    assert receiver.stats() == (2, 0, 0, 1, 1)
+    assert [context['message'] for context in exceptions] == ['Failed to resolve callback for payment garbled']
+
+
+@pytest.mark.asyncio
+async def test_start_replaces_a_finished_worker(rsa_key):
+    handler = _Handler()
+    async with AsyncSatispayClient('key_id', rsa_key, transport=_Transport({'a': 'ACCEPTED'})) as client:
+        receiver = CallbackReceiver(client, handler)
+        finished = asyncio.get_event_loop().create_future()
+        finished.set_result(None)
+        receiver._worker = finished
+        receiver.submit('a')
+        await asyncio.wait_for(receiver.join(), 1)
+        await receiver.close()
+    assert [payment.id for payment in handler.payments] == ['a']
+
+
+@pytest.mark.asyncio
+async def test_close_during_a_batch_forgets_its_payments(rsa_key):
+    sent = asyncio.Event()
+    release = asyncio.Event()
+
+    async def handle(request):
+        sent.set()
+        await release.wait()
+        return httpx.Response(200, json={'id': 'a', 'status': 'ACCEPTED'})
+
+    handler = _Handler()
+    async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handle)) as client:
+        receiver = CallbackReceiver(client, handler, batch_delay=0)
+        receiver.start()
+        receiver.submit('a')
+        await asyncio.wait_for(sent.wait(), 1)
+        await receiver.close()
+        release.set()
+        receiver.start()
+        receiver.submit('a')
+        await asyncio.wait_for(receiver.join(), 1)
+        await receiver.close()
+    assert [payment.id for payment in handler.payments] == ['a']
+    assert receiver.stats().duplicates == 0
+
+
+@pytest.mark.asyncio
+async def test_lifespan(rsa_key):
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    async with AsyncSatispayClient('key_id', rsa_key, transport=_Transport({})) as client:
+        receiver = CallbackReceiver(client, _Handler())
+        await receiver({'type': 'lifespan'}, receive, send)
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert receiver._worker is None
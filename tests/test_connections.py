@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, SatispayClient
+from satispaython import client as client_module
+
+
+class TestSatispayClient:
+
+    def test_warmup_opens_connections(self, rsa_key, base_url):
+        with SatispayClient('key_id', rsa_key, base_url=base_url, track_connections=True) as client:
+            assert client.warmup(3) == 3
+            assert client.warmup(3) == 0
+            for _ in range(3):
+                client.get_payment_details('payment_id')
+            stats = client.connection_stats()
+        assert stats.requests == 3
+        assert stats.reused == 3
+        assert stats.opened == 3
+        assert stats.reuse_ratio == 1.0
+
+    def test_cold_requests_open_connections(self, rsa_key, base_url):
+        with SatispayClient('key_id', rsa_key, base_url=base_url, track_connections=True) as client:
+            client.get_payment_details('payment_id')
+            client.get_payment_details('payment_id')
+            stats = client.connection_stats()
+        assert (stats.requests, stats.reused, stats.opened) == (2, 1, 1)
+        assert stats.reuse_ratio == 0.5
+
+    def test_keepalive_refreshes_idle_connections(self, rsa_key, base_url):
+        limits = httpx.Limits(keepalive_expiry=0.3)
+        with SatispayClient(
+            'key_id', rsa_key, base_url=base_url, limits=limits, track_connections=True
+        ) as client:
+            client.warmup(2)
+            client.start_keepalive(0.1, connections=2)
+            time.sleep(0.6)
+            client.stop_keepalive()
+            client.get_payment_details('payment_id')
+            stats = client.connection_stats()
+        assert stats.opened == 2
+        assert stats.reused == 1
+
+    def test_warmup_without_connections(self, rsa_key, base_url):
+        with SatispayClient('key_id', rsa_key, base_url=base_url) as client:
+            assert client.warmup(0) == 0
+
+    def test_keepalive_logs_unexpected_errors(self, rsa_key, base_url, monkeypatch, caplog):
+        with SatispayClient('key_id', rsa_key, base_url=base_url) as client:
+            monkeypatch.setattr(client, 'warmup', lambda connections: 1 / 0)
+            client.start_keepalive(0.01)
+            time.sleep(0.05)
+            assert client._keepalive[1].is_alive()
+            client.stop_keepalive()
+        assert 'Keep-alive ping failed' in caplog.messages
+
+    def test_close_stops_keepalive(self, rsa_key, base_url):
+        client = SatispayClient('key_id', rsa_key, base_url=base_url)
+        client.start_keepalive(0.01)
+        thread = client._keepalive[1]
+        client.close()
+        assert not thread.is_alive()
+
+    def test_stats_are_opt_in(self, rsa_key, base_url, monkeypatch):
+        monkeypatch.setattr(client_module, '_set_timings', None)
+        with SatispayClient('key_id', rsa_key, base_url=base_url) as client:
+            assert client.warmup(2) == 2
+            assert client.get_payment_details('payment_id').status_code == 200
+            assert client.connection_stats() == (0, 0, 0)
+
+    def test_custom_transport_has_no_stats(self, rsa_key):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+        with SatispayClient('key_id', rsa_key, transport=transport, track_connections=True) as client:
+            client.get_payment_details('payment_id')
+            assert client.connection_stats() == (0, 0, 0)
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_warmup_opens_connections(self, rsa_key, base_url):
+        async with AsyncSatispayClient('key_id', rsa_key, base_url=base_url, track_connections=True) as client:
+            assert await client.warmup(3) == 3
+            await asyncio.gather(*(client.get_payment_details('payment_id') for _ in range(3)))
+            stats = client.connection_stats()
+        assert (stats.requests, stats.reused, stats.opened) == (3, 3, 3)
+
+    @pytest.mark.asyncio
+    async def test_keepalive_refreshes_idle_connections(self, rsa_key, base_url):
+        limits = httpx.Limits(keepalive_expiry=0.3)
+        async with AsyncSatispayClient(
+            'key_id', rsa_key, base_url=base_url, limits=limits, track_connections=True
+        ) as client:
+            await client.warmup()
+            await client.start_keepalive(0.1)
+            await asyncio.sleep(0.6)
+            await client.stop_keepalive()
+            await client.get_payment_details('payment_id')
+            stats = client.connection_stats()
+        assert (stats.requests, stats.reused, stats.opened) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_warmup_without_connections(self, rsa_key, base_url):
+        async with AsyncSatispayClient('key_id', rsa_key, base_url=base_url) as client:
+            assert await client.warmup(0) == 0
+
+    @pytest.mark.asyncio
+    async def test_keepalive_logs_unexpected_errors(self, rsa_key, base_url, monkeypatch, caplog):
+        async def warmup(connections):
+            raise RuntimeError('failed')
+
+        async with AsyncSatispayClient('key_id', rsa_key, base_url=base_url) as client:
+            monkeypatch.setattr(client, 'warmup', warmup)
+            await client.start_keepalive(0.01)
+            await asyncio.sleep(0.05)
+            assert not client._keepalive[1].done()
+            await client.stop_keepalive()
+        assert 'Keep-alive ping failed' in caplog.messages
+
+    @pytest.mark.asyncio
+    async def test_close_stops_keepalive(self, rsa_key, base_url):
+        client = AsyncSatispayClient('key_id', rsa_key, base_url=base_url)
+        await client.start_keepalive(0.01)
+        task = client._keepalive[1]
+        await client.aclose()
+        assert task.done()
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient
+from satispaython.hedge import HedgePolicy
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, *delays):
+        super().__init__(self.handle)
+        self.delays = list(delays)
+        self.requests = []
+        self.cancelled = 0
+
+    async def handle(self, request):
+        self.requests.append(request)
+        attempt = len(self.requests)
+        try:
+            await asyncio.sleep(self.delays.pop(0))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(200, json={'id': 'payment_id', 'attempt': attempt})
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(rsa_key):
+    hedge = HedgePolicy(initial_delay=0.05)
+    transport = _Transport(5, 0)
+    async with AsyncSatispayClient('key_id', rsa_key, hedge=hedge, transport=transport) as client:
+        start = time.perf_counter()
+        response = await client.get_payment_details('payment_id')
+        assert time.perf_counter() - start < 1
+        await asyncio.sleep(0)
+    assert response.json()['attempt'] == 2
+    assert transport.cancelled == 1
+    assert all('Authorization' in request.headers for request in transport.requests)
+    assert hedge.stats() == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged(rsa_key):
+    hedge = HedgePolicy(initial_delay=0.5)
+    transport = _Transport(0)
+    async with AsyncSatispayClient('key_id', rsa_key, hedge=hedge, transport=transport) as client:
+        response = await client.get_payment_details('payment_id')
+    assert response.json()['attempt'] == 1
+    assert hedge.stats() == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_budget(rsa_key):
+    hedge = HedgePolicy(initial_delay=0.01, budget=0.5, max_tokens=1)
+    transport = _Transport(0.05, 0, 0.05, 0.05, 0.05, 0)
+    async with AsyncSatispayClient('key_id', rsa_key, hedge=hedge, transport=transport) as client:
+        for _ in range(4):
+            await client.get_payment_details('payment_id')
+    assert hedge.stats().requests == 4
+    assert hedge.stats().hedged == 2
+    assert len(transport.requests) == 6
+
+
+@pytest.mark.asyncio
+async def test_errors():
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError('failed')
+
+    hedge = HedgePolicy(initial_delay=0.001)
+    with pytest.raises(ValueError):
+        await hedge.run(failing)
+    assert hedge.stats() == (1, 1, 0)
+
+
+def test_delay_is_learned():
+    hedge = HedgePolicy(percentile=90, window=10, min_samples=5, initial_delay=1, min_delay=0.001)
+    for latency in (0.002, 0.001, 0.003):
+        hedge.observe(latency)
+    assert hedge.delay == 1
+    for latency in range(4, 14):
+        hedge.observe(latency / 1000)
+    assert hedge.delay == 0.012
@@ -0,0 +1,44 @@
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient
+from satispaython import client as client_module
+
+
+def _transport():
+    return httpx.MockTransport(lambda request: httpx.Response(200, json={'id': 'payment_id'}))
+
+
+@pytest.mark.asyncio
+async def test_http2_limits(rsa_key, monkeypatch):
+    limits = []
+    monkeypatch.setattr(client_module, '_http2_available', lambda: True)
+    monkeypatch.setattr(AsyncSatispayClient, '_init_transport', lambda self, **kwargs: limits.append(kwargs) or _transport())
+    async with AsyncSatispayClient('key_id', rsa_key, http2=True):
+        pass
+    async with AsyncSatispayClient('key_id', rsa_key, http2=True, limits=httpx.Limits(max_connections=5)):
+        pass
+    async with AsyncSatispayClient('key_id', rsa_key):
+        pass
+    assert [kwargs['http2'] for kwargs in limits] == [True, True, False]
+    assert limits[0]['limits'] is client_module.HTTP2_LIMITS
+    assert limits[1]['limits'].max_connections == 5
+    assert limits[2]['limits'] is not client_module.HTTP2_LIMITS
+
+
+@pytest.mark.asyncio
+async def test_http2_unavailable(rsa_key, monkeypatch):
+    monkeypatch.setattr(client_module, '_http2_available', lambda: False)
+    with pytest.warns(RuntimeWarning):
+        client = AsyncSatispayClient('key_id', rsa_key, http2=True, transport=_transport())
+    async with client:
+        assert (await client.get_payment_details('payment_id')).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_http1_fallback(rsa_key, base_url):
+    pytest.importorskip('h2')
+    async with AsyncSatispayClient('key_id', rsa_key, http2=True) as client:
+        client.base_url = base_url
+        response = await client.get_payment_details('payment_id')
+    assert response.http_version == 'HTTP/1.1'
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pytest
+
+import satispaython
+import satispaython.utils
+
+HEAVY_MODULES = ['httpx', 'cryptography', 'importlib.metadata', 'importlib_metadata']
+
+
+def _loaded_after(statement):
+    code = f'import sys\n{statement}\nprint(" ".join(sorted(sys.modules)))'
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE).stdout
+    return set(output.decode().split())
+
+
+@pytest.mark.parametrize('statement', ['import satispaython', 'import satispaython.utils'])
+def test_import_is_lazy(statement):
+    loaded = _loaded_after(statement)
+    assert not loaded.intersection(HEAVY_MODULES)
+
+
+def test_names_load_on_first_access():
+    loaded = _loaded_after('from satispaython import Payment')
+    assert 'satispaython.models' in loaded
+    assert 'satispaython.client' not in loaded
+    assert 'satispaython.api' not in loaded
+
+
+@pytest.mark.parametrize('package', [satispaython, satispaython.utils])
+def test_public_names(package):
+    for name in package.__all__:
+        assert getattr(package, name).__name__ == name
+        assert name in dir(package)
+
+
+def test_version():
+    assert satispaython.__version__ == subprocess.run(
+        [sys.executable, '-c', 'import importlib.metadata as m; print(m.version("satispaython"))'],
+        check=True, stdout=subprocess.PIPE
+    ).stdout.decode().strip()
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError, match='no attribute'):
+        satispaython.missing
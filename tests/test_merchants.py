@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from pytest import fixture, mark
+
+from satispaython.merchants import AsyncMerchantManager, MerchantManager
+
+
+@fixture()
+def create_payment_staging_no_optionals_signature():
+    path = Path(__file__).resolve().parent / 'data/create_payment_staging_no_optionals_signature.txt'
+    with open(path, 'r') as file:
+        return file.read().strip()
+
+
+class _KeyLoader:
+
+    def __init__(self, rsa_key):
+        self.rsa_key = rsa_key
+        self.loaded = []
+
+    def __call__(self, key_id):
+        self.loaded.append(key_id)
+        return self.rsa_key
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self):
+        super().__init__(self.handle)
+        self.requests = []
+
+    def handle(self, request):
+        self.requests.append(request)
+        return httpx.Response(200, json={'id': 'payment_id'})
+
+
+class TestMerchantManager:
+
+    @mark.freeze_time('Mon, 18 Mar 2019 15:10:24 +0000')
+    def test_requests_are_signed_per_merchant(self, rsa_key, create_payment_staging_no_optionals_signature):
+        transport = _Transport()
+        with MerchantManager(_KeyLoader(rsa_key), True, transport=transport) as manager:
+            manager.for_merchant('key_a').create_payment(100, 'EUR')
+            manager.for_merchant('key_b').get_payment_details('payment_id')
+        first, second = transport.requests
+        assert first.url == 'https://staging.authservices.satispay.com/g_business/v1/payments'
+        assert json.loads(first.content) == {'flow': 'MATCH_CODE', 'amount_unit': 100, 'currency': 'EUR'}
+        assert first.headers['Accept'] == 'application/json'
+        assert first.headers['Content-Type'] == 'application/json'
+        assert first.headers['Authorization'] == 'Signature keyId="key_a", ' \
+                                                 'algorithm="rsa-sha256", ' \
+                                                 'headers="(request-target) host date digest", ' \
+                                                 f'signature="{create_payment_staging_no_optionals_signature}"'
+        assert second.url == 'https://staging.authservices.satispay.com/g_business/v1/payments/payment_id'
+        assert second.headers['Authorization'].startswith('Signature keyId="key_b", ')
+
+    def test_keys_lru(self, rsa_key):
+        key_loader = _KeyLoader(rsa_key)
+        with MerchantManager(key_loader, max_merchants=2, transport=_Transport()) as manager:
+            for key_id in ('a', 'b', 'a', 'c', 'a', 'b'):
+                manager.for_merchant(key_id)
+            assert len(manager) == 2
+            manager.forget('a')
+            manager.for_merchant('a')
+        assert key_loader.loaded == ['a', 'b', 'c', 'b', 'a']
+
+    def test_shared_connection_pool(self, rsa_key):
+        with MerchantManager(_KeyLoader(rsa_key)) as manager:
+            first, second = manager.for_merchant('a'), manager.for_merchant('b')
+            assert first._client is second._client
+            assert first.key_id == 'a'
+            assert second.key_id == 'b'
+
+
+class TestAsyncMerchantManager:
+
+    @pytest.mark.asyncio
+    async def test_requests_are_signed_per_merchant(self, rsa_key):
+        transport = _Transport()
+        async with AsyncMerchantManager(_KeyLoader(rsa_key), transport=transport) as manager:
+            await manager.for_merchant('key_a').get_payment_details('payment_id')
+            await manager.for_merchant('key_b').create_payment(100, 'EUR')
+        first, second = transport.requests
+        assert first.url == 'https://authservices.satispay.com/g_business/v1/payments/payment_id'
+        assert first.headers['Authorization'].startswith('Signature keyId="key_a", ')
+        assert second.headers['Authorization'].startswith('Signature keyId="key_b", ')
+        assert second.headers['Digest'] == 'SHA-256=a5UF/fcWo+KdzPGADk9XDV/CwKsGyrNLNKGind53oVM='
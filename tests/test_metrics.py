@@ -0,0 +1,106 @@
+import logging
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, SatispayClient
+from satispaython import metrics
+from satispaython.metrics import LoggingHook, MetricsHook, PrometheusHook
+
+
+class _Recorder(MetricsHook):
+
+    def __init__(self):
+        self.timings = []
+
+    def on_request(self, timings):
+        self.timings.append(timings)
+
+
+def _mock_transport():
+    return httpx.MockTransport(lambda request: httpx.Response(200, json={'status': 'PENDING'}))
+
+
+def _assert_phases(timings, connect):
+    for phase in ('digest', 'compose', 'sign', 'ttfb', 'total'):
+        assert getattr(timings, phase) > 0
+    assert timings.total > timings.ttfb
+    assert (timings.connect is not None) is connect
+
+
+class TestSatispayClient:
+
+    def test_mock_transport(self, rsa_key):
+        recorder = _Recorder()
+        with SatispayClient('key_id', rsa_key, metrics=recorder, transport=_mock_transport()) as client:
+            client.create_payment(100, 'EUR')
+        timings, = recorder.timings
+        assert (timings.method, timings.path, timings.status_code) == ('POST', '/g_business/v1/payments', 200)
+        _assert_phases(timings, connect=False)
+
+    def test_connection_acquisition(self, rsa_key, base_url):
+        recorder = _Recorder()
+        with SatispayClient('key_id', rsa_key, metrics=recorder) as client:
+            client.base_url = base_url
+            client.get_payment_details('payment_id')
+            client.get_payment_details('payment_id')
+        first, second = recorder.timings
+        _assert_phases(first, connect=True)
+        _assert_phases(second, connect=False)
+        assert first.ttfb > first.connect
+
+    def test_no_hook(self, rsa_key):
+        with SatispayClient('key_id', rsa_key, transport=_mock_transport()) as client:
+            assert isinstance(client._transport, httpx.MockTransport)
+            assert client.get_payment_details('payment_id').status_code == 200
+
+
+    def test_without_httpcore_backends(self, rsa_key, base_url, monkeypatch):
+        monkeypatch.setattr(metrics, 'lookup_sync_backend', None)
+        recorder = _Recorder()
+        with SatispayClient('key_id', rsa_key, metrics=recorder, base_url=base_url) as client:
+            client.get_payment_details('payment_id')
+        timings, = recorder.timings
+        assert timings.connect is None
+        assert timings.ttfb > 0
+
+    def test_hooks_implement_on_request(self):
+        with pytest.raises(TypeError):
+            MetricsHook()
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_connection_acquisition(self, rsa_key, base_url):
+        recorder = _Recorder()
+        async with AsyncSatispayClient('key_id', rsa_key, metrics=recorder) as client:
+            client.base_url = base_url
+            await client.get_payment_details('payment_id')
+            await client.create_payment(100, 'EUR')
+        first, second = recorder.timings
+        _assert_phases(first, connect=True)
+        _assert_phases(second, connect=False)
+        assert second.method == 'POST'
+
+
+class TestHooks:
+
+    def test_logging_hook(self, rsa_key, caplog):
+        caplog.set_level(logging.INFO, logger='satispaython')
+        with SatispayClient('key_id', rsa_key, metrics=LoggingHook(), transport=_mock_transport()) as client:
+            client.get_payment_details('payment_id')
+        record, = caplog.records
+        assert record.getMessage().startswith('GET /g_business/v1/payments/payment_id 200 digest=')
+
+    def test_prometheus_hook(self, rsa_key):
+        prometheus_client = pytest.importorskip('prometheus_client')
+        registry = prometheus_client.CollectorRegistry()
+        hook = PrometheusHook(registry)
+        with SatispayClient('key_id', rsa_key, metrics=hook, transport=_mock_transport()) as client:
+            client.get_payment_details('payment_id')
+            client.get_payment_details('payment_id')
+        labels = {'method': 'GET', 'phase': 'sign'}
+        assert registry.get_sample_value('satispaython_request_phase_seconds_count', labels) == 2
+        labels = {'method': 'GET', 'phase': 'connect'}
+        assert registry.get_sample_value('satispaython_request_phase_seconds_count', labels) is None
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import httpx
+
+from satispaython import Payment
+
+PAYMENT = {
+    'id': '7b5d2f8c-0bb6-4b0c-9e7b-1e6c5e4f3a2d',
+    'code_identifier': 'S6Y-PAY--7B5D2F8C',
+    'type': 'TO_BUSINESS',
+    'amount_unit': 1999,
+    'currency': 'EUR',
+    'status': 'ACCEPTED',
+    'expired': False,
+    'metadata': {'order_id': '42'},
+    'sender': {'id': 'sender_id', 'type': 'CONSUMER', 'name': 'Mario'},
+    'receiver': {'id': 'receiver_id', 'type': 'SHOP'},
+    'insert_date': '2019-03-18T16:10:24.000Z',
+    'expire_date': '2019-03-18T16:30:24.123Z',
+    'refund_info': {'refunded': False}
+}
+
+
+class TestPayment:
+
+    def test_lazy_parsing(self):
+        payment = Payment(json.dumps(PAYMENT).encode())
+        assert payment._values is None
+        assert payment.status == 'ACCEPTED'
+        assert payment._raw is None
+        assert payment.is_terminal
+
+    def test_fields(self):
+        payment = Payment.from_response(httpx.Response(200, json=PAYMENT))
+        assert payment.id == PAYMENT['id']
+        assert payment.amount_unit == 1999
+        assert payment.amount == Decimal('19.99')
+        assert payment.currency == 'EUR'
+        assert payment.expired is False
+        assert payment.metadata == {'order_id': '42'}
+        assert payment.sender['name'] == 'Mario'
+        assert payment.insert_date == datetime(2019, 3, 18, 16, 10, 24, tzinfo=timezone.utc)
+        assert payment.expire_date == datetime(2019, 3, 18, 16, 30, 24, 123000, tzinfo=timezone.utc)
+        assert payment.external_code is None
+        assert payment.get('refund_info') == {'refunded': False}
+        assert payment.get('external_code', 'missing') == 'missing'
+        assert payment.to_dict() == PAYMENT
+        assert repr(payment) == f"Payment(id='{PAYMENT['id']}', status='ACCEPTED')"
+
+    def test_from_dict(self):
+        payment = Payment.from_dict({'id': 'payment_id', 'status': 'PENDING'})
+        assert payment == Payment(b'{"status": "PENDING", "id": "payment_id"}')
+        assert payment.amount is None
+        assert payment.insert_date is None
+        assert not payment.is_terminal
+        assert not hasattr(payment, '__dict__')
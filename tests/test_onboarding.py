@@ -0,0 +1,70 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from satispaython.onboarding import provision_merchants
+from satispaython.utils import load_key
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, failing=(), key_ids=None):
+        super().__init__(self.handle)
+        self.failing = failing
+        self.key_ids = key_ids or {}
+        self.bodies = {}
+
+    def handle(self, request):
+        body = json.loads(request.content)
+        self.bodies[body['token']] = body['public_key']
+        if body['token'] in self.failing:
+            return httpx.Response(403, json={'code': 45})
+        key_id = self.key_ids.get(body['token'], f'key_{body["token"]}')
+        return httpx.Response(200, json={'key_id': key_id})
+
+
+async def _provision(tokens, key_dir, transport, **kwargs):
+    with ThreadPoolExecutor() as executor:
+        results = provision_merchants(tokens, key_dir, executor=executor, key_size=1024, transport=transport, **kwargs)
+        return {result.token: result async for result in results}
+
+
+@pytest.mark.asyncio
+async def test_provision_merchants(tmp_path):
+    transport = _Transport()
+    results = await _provision(['a', 'b', 'c'], tmp_path, transport, password='password', concurrency=2)
+    assert sorted(results) == ['a', 'b', 'c']
+    for token, result in results.items():
+        assert result.error is None
+        assert result.key_id == f'key_{token}'
+        assert result.key_path == tmp_path / f'key_{token}.pem'
+        rsa_key = load_key(result.key_path, 'password')
+        assert rsa_key.public_key().public_numbers().n.bit_length() == 1024
+        assert transport.bodies[token].startswith('-----BEGIN PUBLIC KEY-----')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['key_a.pem', 'key_b.pem', 'key_c.pem']
+
+
+@pytest.mark.asyncio
+async def test_provision_merchants_failure_keeps_key(tmp_path):
+    results = await _provision(['a', 'b'], tmp_path, _Transport(failing={'b'}))
+    assert results['a'].error is None
+    failed = results['b']
+    assert isinstance(failed.error, httpx.HTTPStatusError)
+    assert failed.key_id is None
+    assert failed.key_path == tmp_path / 'b.pem'
+    assert load_key(failed.key_path) is not None
+
+
+@pytest.mark.asyncio
+async def test_provision_merchants_rejects_unsafe_file_names(tmp_path):
+    key_dir = tmp_path / 'keys'
+    transport = _Transport(key_ids={'b': '../b'})
+    results = await _provision(['../a', 'b'], key_dir, transport)
+    assert isinstance(results['../a'].error, ValueError)
+    assert results['../a'].key_path is None
+    assert '../a' not in transport.bodies
+    assert isinstance(results['b'].error, ValueError)
+    assert results['b'].key_path == key_dir / 'b.pem'
+    assert sorted(path.name for path in tmp_path.rglob('*.pem')) == ['b.pem']
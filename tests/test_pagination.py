@@ -0,0 +1,93 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, Payment, SatispayClient
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, pages, failing=False):
+        super().__init__(self.handle)
+        self.pages = pages
+        self.failing = failing
+        self.requests = []
+
+    def handle(self, request):
+        self.requests.append(request)
+        if self.failing:
+            return httpx.Response(500)
+        starting_after = request.url.params.get('starting_after')
+        index = 0 if starting_after is None else int(starting_after) // 10
+        data = [{'id': str(index * 10 + 10 + item), 'status': 'ACCEPTED'} for item in range(self.pages[index])]
+        return httpx.Response(200, json={'has_more': index + 1 < len(self.pages), 'data': data})
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+async def _prefetched(transport):
+    while len(transport.requests) < 2:
+        await asyncio.sleep(0.001)
+
+
+class TestSatispayClient:
+
+    def test_iter_payments(self, rsa_key):
+        transport = _Transport([2, 2, 1])
+        since = datetime(2019, 3, 18, 16, 10, 24, tzinfo=timezone.utc)
+        with SatispayClient('key_id', rsa_key, transport=transport) as client:
+            payments = client.iter_payments(status='ACCEPTED', starting_after_timestamp=since, limit=2)
+            first = next(payments)
+            _wait_for(lambda: len(transport.requests) == 2)
+            assert len(transport.requests) == 2
+            rest = list(payments)
+        assert isinstance(first, Payment)
+        assert [payment.id for payment in [first] + rest] == ['10', '11', '20', '21', '30']
+        first_request, second_request, third_request = transport.requests
+        assert dict(first_request.url.params) == {
+            'limit': '2',
+            'status': 'ACCEPTED',
+            'starting_after_timestamp': '2019-03-18T16:10:24.000Z'
+        }
+        assert second_request.url.params['starting_after'] == '11'
+        assert third_request.url.params['starting_after'] == '21'
+        assert 'Authorization' in third_request.headers
+
+    def test_errors(self, rsa_key):
+        with SatispayClient('key_id', rsa_key, transport=_Transport([1], failing=True)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                list(client.iter_payments())
+
+    def test_empty(self, rsa_key):
+        with SatispayClient('key_id', rsa_key, transport=_Transport([0])) as client:
+            assert list(client.iter_payments(starting_after='5')) == []
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_iter_payments(self, rsa_key):
+        transport = _Transport([3, 1])
+        async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+            payments = client.iter_payments(limit=3)
+            first = await payments.__anext__()
+            await asyncio.wait_for(_prefetched(transport), 5)
+            rest = [payment async for payment in payments]
+        assert [payment.id for payment in [first] + rest] == ['10', '11', '12', '20']
+        assert transport.requests[1].url.params['starting_after'] == '12'
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_prefetch(self, rsa_key):
+        transport = _Transport([2, 2])
+        async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+            payments = client.iter_payments()
+            await payments.__anext__()
+            await payments.aclose()
+        assert len(transport.requests) == 1
@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, RateLimiter, Retry, SatispayClient
+from satispaython.ratelimit import FileRateLimitBackend, MemoryRateLimitBackend, RateLimitBackend
+
+
+def _reserve_many(directory, count):
+    limiter = RateLimiter(rate=10, backend=FileRateLimitBackend(directory))
+    return [limiter.reserve('key_id') for _ in range(count)]
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, *statuses, retry_after='0.2'):
+        super().__init__(self.handle)
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.sent = []
+
+    def handle(self, request):
+        self.sent.append(time.monotonic())
+        status = self.statuses.pop(0)
+        headers = {'Retry-After': self.retry_after} if status == 429 else {}
+        return httpx.Response(status, json={'id': 'payment_id'}, headers=headers)
+
+
+class TestRateLimiter:
+
+    @pytest.mark.parametrize('backend', [MemoryRateLimitBackend, FileRateLimitBackend])
+    def test_burst_then_rate(self, backend, tmp_path):
+        backend = backend() if backend is MemoryRateLimitBackend else backend(tmp_path)
+        limiter = RateLimiter(rate=10, burst=3, backend=backend)
+        delays = [limiter.reserve('key_id') for _ in range(5)]
+        assert delays[:3] == [0, 0, 0]
+        assert delays[3] == pytest.approx(0.1, abs=0.02)
+        assert delays[4] == pytest.approx(0.2, abs=0.02)
+        assert limiter.reserve('other_key_id') == 0
+
+    def test_throttled_response_blocks_key(self):
+        limiter = RateLimiter(rate=100)
+        limiter.observe('key_id', httpx.Response(429, headers={'Retry-After': '2'}))
+        limiter.observe('key_id', httpx.Response(200))
+        assert limiter.throttled == 1
+        assert limiter.reserve('key_id') == pytest.approx(2, abs=0.02)
+        assert limiter.reserve('key_id') == pytest.approx(2.01, abs=0.02)
+        assert limiter.reserve('other_key_id') == 0
+
+    @pytest.mark.parametrize('value, expected', [
+        ('3', 3), ('0.5', 0.5), ('-1', 0), ('3600', 60), ('soon', 1), (None, 1),
+        ('Mon, 18 Mar 2019 15:10:24 GMT', 0),
+    ])
+    def test_retry_after(self, value, expected):
+        headers = {} if value is None else {'Retry-After': value}
+        assert RateLimiter(rate=1).get_retry_after(httpx.Response(429, headers=headers)) == expected
+
+    def test_backends_implement_the_interface(self):
+        class Incomplete(RateLimitBackend):
+            def reserve(self, key, interval, tolerance):
+                return 0.0
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_file_backend_is_shared_across_processes(self, tmp_path):
+        with ProcessPoolExecutor(2) as executor:
+            futures = [executor.submit(_reserve_many, str(tmp_path), 5) for _ in range(2)]
+            delays = sorted(delay for future in futures for delay in future.result())
+        assert delays[0] == 0
+        assert delays[-1] >= 0.8
+
+
+class TestSatispayClient:
+
+    def test_paces_requests(self, rsa_key):
+        transport = _Transport(200, 200, 200)
+        with SatispayClient('key_id', rsa_key, rate_limit=RateLimiter(rate=20), transport=transport) as client:
+            started = time.monotonic()
+            for _ in range(3):
+                client.get_payment_details('payment_id')
+        assert transport.sent[-1] - started >= 0.1
+
+    def test_retry_honours_retry_after(self, rsa_key):
+        transport = _Transport(429, 200)
+        limiter = RateLimiter(rate=100)
+        retry = Retry(backoff=0.001)
+        with SatispayClient('key_id', rsa_key, rate_limit=limiter, retry=retry, transport=transport) as client:
+            response = client.get_payment_details('payment_id')
+        assert response.status_code == 200
+        assert transport.sent[1] - transport.sent[0] >= 0.19
+        assert limiter.throttled == 1
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_retry_honours_retry_after(self, rsa_key):
+        transport = _Transport(429, 200)
+        limiter = RateLimiter(rate=100)
+        retry = Retry(backoff=0.001)
+        async with AsyncSatispayClient(
+            'key_id', rsa_key, rate_limit=limiter, retry=retry, transport=transport
+        ) as client:
+            response = await client.create_payment(100, 'EUR')
+        assert response.status_code == 200
+        assert transport.sent[1] - transport.sent[0] >= 0.19
+
+    @pytest.mark.asyncio
+    async def test_clients_share_the_budget(self, rsa_key):
+        transport = _Transport(200, 200, 200, 200)
+        limiter = RateLimiter(rate=20, burst=2)
+        async with AsyncSatispayClient('key_id', rsa_key, rate_limit=limiter, transport=transport) as first, \
+                AsyncSatispayClient('key_id', rsa_key, rate_limit=limiter, transport=transport) as second:
+            started = time.monotonic()
+            for client in (first, second, first, second):
+                await client.get_payment_details('payment_id')
+        assert transport.sent[-1] - started >= 0.1
@@ -0,0 +1,78 @@
+import respx
+from cryptography.hazmat.primitives import serialization
+from httpx import Limits
+from pytest import fixture
+
+from satispaython import ClientRegistry
+from satispaython.registry import default_registry
+
+
+@fixture()
+def registry():
+    registry = ClientRegistry()
+    yield registry
+    registry.close()
+
+
+class TestClientRegistry:
+
+    def test_reuses_client(self, registry, rsa_key):
+        with registry.client('key_id', rsa_key) as first:
+            pass
+        with registry.client('key_id', rsa_key) as second:
+            pass
+        assert first is second
+        assert not first.is_closed
+        assert len(registry) == 1
+
+    def test_reuses_client_with_equal_key(self, registry, rsa_key):
+        pem = rsa_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        with registry.client('key_id', rsa_key) as first:
+            pass
+        with registry.client('key_id', serialization.load_pem_private_key(pem, None)) as second:
+            pass
+        assert first is second
+
+    def test_staging_and_production_are_separate(self, registry, rsa_key):
+        with registry.client('key_id', rsa_key, True) as staging:
+            assert staging.base_url.host == 'staging.authservices.satispay.com'
+        with registry.client('key_id', rsa_key) as production:
+            assert production.base_url.host == 'authservices.satispay.com'
+        assert len(registry) == 2
+
+    def test_limits(self, rsa_key):
+        registry = ClientRegistry(limits=Limits(max_connections=1, max_keepalive_connections=1))
+        with registry.client('key_id', rsa_key) as client:
+            assert client._transport._pool._max_connections == 1
+        registry.close()
+
+    def test_default_registry_keeps_connections_alive(self, rsa_key):
+        with default_registry.client('key_id', rsa_key) as client:
+            assert client._transport._pool._keepalive_expiry == 300.0
+
+    def test_close_idle(self, rsa_key):
+        registry = ClientRegistry(idle_timeout=0)
+        with registry.client('key_id', rsa_key) as client:
+            registry.close_idle()
+            assert not client.is_closed
+        registry.close_idle()
+        assert client.is_closed
+        assert len(registry) == 0
+
+    def test_close_waits_for_clients_in_use(self, registry, rsa_key):
+        with registry.client('key_id', rsa_key) as client:
+            registry.close()
+            assert not client.is_closed
+        assert client.is_closed
+
+    @respx.mock
+    def test_keeps_working_after_close(self, registry, rsa_key):
+        route = respx.get('https://authservices.satispay.com/g_business/v1/payments/payment_id')
+        with registry.client('key_id', rsa_key) as client:
+            client.get_payment_details('payment_id')
+        registry.close()
+        with registry.client('key_id', rsa_key) as client:
+            client.get_payment_details('payment_id')
+        assert route.call_count == 2
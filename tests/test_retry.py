@@ -0,0 +1,150 @@
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, Retry, SatispayClient
+from satispaython.retry import parse_retry_after
+
+
+class _Transport(httpx.MockTransport):
+
+    def __init__(self, *outcomes, freezer=None, retry_after=None):
+        super().__init__(self.handle)
+        self.outcomes = list(outcomes)
+        self.freezer = freezer
+        self.retry_after = retry_after
+        self.requests = []
+        self.sent = []
+
+    def handle(self, request):
+        self.requests.append(request)
+        self.sent.append(time.monotonic())
+        if self.freezer is not None:
+            self.freezer.tick(timedelta(seconds=1))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        headers = {} if self.retry_after is None else {'Retry-After': self.retry_after}
+        return httpx.Response(outcome, json={'id': 'payment_id'}, headers=headers)
+
+
+def _retry(**kwargs):
+    return Retry(backoff=0.001, **kwargs)
+
+
+class TestSatispayClient:
+
+    def test_each_attempt_is_signed_again(self, rsa_key, freezer):
+        freezer.move_to('Mon, 18 Mar 2019 15:10:24 +0000')
+        transport = _Transport(503, 502, 200, freezer=freezer)
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            response = client.get_payment_details('payment_id')
+        assert response.status_code == 200
+        dates = [request.headers['Date'] for request in transport.requests]
+        assert dates == [
+            'Mon, 18 Mar 2019 15:10:24 +0000',
+            'Mon, 18 Mar 2019 15:10:25 +0000',
+            'Mon, 18 Mar 2019 15:10:26 +0000'
+        ]
+        assert len({request.headers['Authorization'] for request in transport.requests}) == 3
+
+    def test_create_payment_keeps_idempotency_key(self, rsa_key):
+        transport = _Transport(httpx.ConnectError('reset'), 500, 200)
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            response = client.create_payment(100, 'EUR')
+        assert response.status_code == 200
+        keys = {request.headers['Idempotency-Key'] for request in transport.requests}
+        assert len(transport.requests) == 3
+        assert len(keys) == 1
+
+    def test_create_payment_custom_idempotency_key(self, rsa_key):
+        transport = _Transport(200)
+        with SatispayClient('key_id', rsa_key, transport=transport) as client:
+            client.create_payment(100, 'EUR', headers={'Idempotency-Key': 'custom'})
+        request, = transport.requests
+        assert request.headers['Idempotency-Key'] == 'custom'
+
+    def test_shared_headers_get_a_new_idempotency_key(self, rsa_key):
+        transport = _Transport(200, 200)
+        headers = httpx.Headers({'X-Request-Id': '1'})
+        with SatispayClient('key_id', rsa_key, transport=transport) as client:
+            client.create_payment(100, 'EUR', headers=headers)
+            client.create_payment(200, 'EUR', headers=headers)
+        first, second = transport.requests
+        assert first.headers['Idempotency-Key'] != second.headers['Idempotency-Key']
+        assert first.headers['X-Request-Id'] == second.headers['X-Request-Id'] == '1'
+        assert 'Idempotency-Key' not in headers
+
+    def test_non_idempotent_requests_are_not_retried(self, rsa_key):
+        transport = _Transport(503)
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            response = client.post('/g_business/v1/payments', json={})
+        assert response.status_code == 503
+        assert len(transport.requests) == 1
+
+    def test_attempts_exhausted(self, rsa_key):
+        transport = _Transport(503, 503, 503)
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            assert client.get_payment_details('payment_id').status_code == 503
+        transport = _Transport(httpx.ReadTimeout('timeout'), httpx.ReadTimeout('timeout'))
+        with SatispayClient('key_id', rsa_key, retry=_retry(attempts=2), transport=transport) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                client.get_payment_details('payment_id')
+
+    def test_client_errors_are_not_retried(self, rsa_key):
+        transport = _Transport(404)
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            assert client.get_payment_details('payment_id').status_code == 404
+        assert len(transport.requests) == 1
+
+    def test_throttled_requests_wait_for_retry_after(self, rsa_key):
+        transport = _Transport(429, 200, retry_after='0.2')
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            assert client.get_payment_details('payment_id').status_code == 200
+        assert transport.sent[1] - transport.sent[0] >= 0.19
+
+    def test_retry_after_past_the_deadline(self, rsa_key):
+        transport = _Transport(429, 200, retry_after='30')
+        with SatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            assert client.get_payment_details('payment_id').status_code == 429
+        assert len(transport.requests) == 1
+
+    def test_deadline(self, rsa_key):
+        transport = _Transport(503, 200)
+        with SatispayClient('key_id', rsa_key, retry=_retry(deadline=0), transport=transport) as client:
+            assert client.get_payment_details('payment_id').status_code == 503
+        assert len(transport.requests) == 1
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_retries(self, rsa_key):
+        transport = _Transport(httpx.RemoteProtocolError('reset'), 504, 201)
+        async with AsyncSatispayClient('key_id', rsa_key, retry=_retry(), transport=transport) as client:
+            response = await client.create_payment(100, 'EUR')
+        assert response.status_code == 201
+        assert len(transport.requests) == 3
+        assert len({request.headers['Idempotency-Key'] for request in transport.requests}) == 1
+
+
+class TestRetry:
+
+    def test_backoff_is_bounded(self):
+        retry = Retry(attempts=10, backoff=1, max_backoff=3, deadline=None)
+        delays = [retry.get_delay(attempt, 0) for attempt in range(1, 10)]
+        assert all(0 <= delay <= 3 for delay in delays)
+        assert retry.get_delay(10, 0) is None
+
+    @pytest.mark.parametrize('value, expected', [('3', 3), ('-1', 0), ('soon', None), (None, None)])
+    def test_parse_retry_after(self, value, expected):
+        headers = {} if value is None else {'Retry-After': value}
+        assert parse_retry_after(httpx.Response(429, headers=headers)) == expected
+
+    def test_delay_honours_retry_after(self):
+        retry = Retry(backoff=0.001, deadline=10)
+        started = time.monotonic()
+        assert retry.get_delay(1, started, httpx.Response(429, headers={'Retry-After': '2'})) == 2
+        assert retry.get_delay(1, started, httpx.Response(429, headers={'Retry-After': '30'})) is None
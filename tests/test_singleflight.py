@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from satispaython import AsyncSatispayClient, SatispayClient
+
+
+class _AsyncTransport(httpx.MockTransport):
+
+    def __init__(self, status_code=200):
+        super().__init__(self.handle)
+        self.status_code = status_code
+        self.release = asyncio.Event()
+        self.requests = []
+        self.cancelled = 0
+
+    async def handle(self, request):
+        self.requests.append(request)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(self.status_code, json={'id': 'payment_id'})
+
+
+async def _wait_for(condition):
+    while not condition():
+        await asyncio.sleep(0.001)
+
+
+class TestAsyncSatispayClient:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self, rsa_key):
+        transport = _AsyncTransport()
+        async with AsyncSatispayClient('key_id', rsa_key, coalesce=True, transport=transport) as client:
+            calls = [asyncio.ensure_future(client.get_payment_details('payment_id')) for _ in range(10)]
+            other = asyncio.ensure_future(client.get_payment_details('other_id'))
+            await _wait_for(lambda: len(transport.requests) == 2)
+            transport.release.set()
+            responses = await asyncio.gather(*calls, other)
+            assert len({id(response) for response in responses[:10]}) == 1
+            assert responses[10] is not responses[0]
+            assert client.coalesced == 9
+            await client.get_payment_details('payment_id')
+        assert len(transport.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_caller(self, rsa_key):
+        transport = _AsyncTransport()
+        async with AsyncSatispayClient('key_id', rsa_key, coalesce=True, transport=transport) as client:
+            first = asyncio.ensure_future(client.get_payment_details('payment_id'))
+            second = asyncio.ensure_future(client.get_payment_details('payment_id'))
+            await _wait_for(lambda: transport.requests)
+            first.cancel()
+            await asyncio.sleep(0)
+            transport.release.set()
+            assert (await second).status_code == 200
+            assert first.cancelled()
+        assert transport.cancelled == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelling_every_caller(self, rsa_key):
+        transport = _AsyncTransport()
+        async with AsyncSatispayClient('key_id', rsa_key, coalesce=True, transport=transport) as client:
+            calls = [asyncio.ensure_future(client.get_payment_details('payment_id')) for _ in range(2)]
+            await _wait_for(lambda: transport.requests)
+            for call in calls:
+                call.cancel()
+            await _wait_for(lambda: transport.cancelled)
+            assert len(client._flights) == 0
+            transport.release.set()
+            assert (await client.get_payment_details('payment_id')).status_code == 200
+        assert len(transport.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self, rsa_key):
+        async def handle(request):
+            await asyncio.sleep(0.01)
+            raise httpx.ConnectError('failed')
+
+        async with AsyncSatispayClient('key_id', rsa_key, coalesce=True, transport=httpx.MockTransport(handle)) as client:
+            results = await asyncio.gather(
+                client.get_payment_details('payment_id'),
+                client.get_payment_details('payment_id'),
+                return_exceptions=True
+            )
+        assert all(isinstance(result, httpx.ConnectError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, rsa_key):
+        transport = _AsyncTransport()
+        transport.release.set()
+        async with AsyncSatispayClient('key_id', rsa_key, transport=transport) as client:
+            await asyncio.gather(*(client.get_payment_details('payment_id') for _ in range(3)))
+            assert client.coalesced == 0
+        assert len(transport.requests) == 3
+
+
+class TestSatispayClient:
+
+    def test_concurrent_calls_share_one_request(self, rsa_key):
+        release = threading.Event()
+        requests = []
+
+        def handle(request):
+            requests.append(request)
+            release.wait(5)
+            return httpx.Response(200, json={'id': 'payment_id'})
+
+        with SatispayClient('key_id', rsa_key, coalesce=True, transport=httpx.MockTransport(handle)) as client:
+            with ThreadPoolExecutor(5) as executor:
+                futures = [executor.submit(client.get_payment_details, 'payment_id') for _ in range(5)]
+                deadline = time.monotonic() + 5
+                while client.coalesced < 4 and time.monotonic() < deadline:
+                    time.sleep(0.001)
+                release.set()
+                responses = [future.result() for future in futures]
+            client.get_payment_details('payment_id', headers={'X-Custom': 'value'})
+        assert len({id(response) for response in responses}) == 1
+        assert client.coalesced == 4
+        assert len(requests) == 2
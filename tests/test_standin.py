@@ -0,0 +1,95 @@
+import json
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from pytest import fixture
+
+from satispaython import AsyncSatispayClient, Retry, SatispayClient
+from satispaython.models import ACCEPTED
+from satispaython.onboarding import provision_merchants
+from satispaython.standin import StandInSatispay
+
+
+@fixture()
+def standin(rsa_key):
+    standin = StandInSatispay(seed=0)
+    standin.register_key('key_id', rsa_key.public_key())
+    return standin
+
+
+class TestStandInServer:
+
+    def test_payments(self, rsa_key, standin):
+        with standin.serve() as server:
+            with SatispayClient('key_id', rsa_key, base_url=server.url) as client:
+                created = client.create_payment(100, 'EUR', {'metadata': {'order_id': '42'}}).json()
+                standin.set_status(created['id'], ACCEPTED)
+                details = client.get_payment_details(created['id'])
+                payments = list(client.iter_payments(status=ACCEPTED))
+                missing = client.get_payment_details('missing')
+        assert created['status'] == 'PENDING'
+        assert created['receiver'] == {'id': 'key_id', 'type': 'SHOP'}
+        assert details.json() == {**created, 'status': ACCEPTED}
+        assert [payment.id for payment in payments] == [created['id']]
+        assert missing.status_code == 404
+        assert standin.get_payment(created['id'])['metadata'] == {'order_id': '42'}
+
+    def test_signature_test_endpoint(self, rsa_key, standin):
+        with standin.serve() as server:
+            with SatispayClient('key_id', rsa_key, base_url=server.url) as client:
+                response = client.post('/wally-services/protocol/tests/signature', json={'flow': 'MATCH_CODE'})
+        content = response.json()
+        assert content['signature']['valid']
+        assert content['signed_string'].startswith('(request-target): post /wally-services/protocol/tests/signature\n')
+
+    def test_rejects_unknown_keys(self, standin):
+        other_key = generate_private_key(65537, 1024)
+        with standin.serve() as server:
+            with SatispayClient('key_id', other_key, base_url=server.url) as client:
+                assert client.get_payment_details('payment_id').status_code == 401
+            with SatispayClient('other_key_id', other_key, base_url=server.url) as client:
+                assert client.get_payment_details('payment_id').status_code == 401
+
+
+class TestStandInSatispay:
+
+    def test_rejects_tampered_requests(self, rsa_key, standin):
+        request = httpx.Request('POST', 'http://standin/g_business/v1/payments', json={'a': 1})
+        request = next(SatispayClient('key_id', rsa_key).auth.sync_auth_flow(request))
+        headers = dict(request.headers)
+        status_code, _, body = standin.handle('POST', '/g_business/v1/payments', headers, b'{"a": 2}')
+        assert (status_code, json.loads(body)['message']) == (401, 'Invalid digest')
+        status_code, _, body = standin.handle('POST', '/g_business/v1/payments?a=1', headers, request.content)
+        assert (status_code, json.loads(body)['message']) == (401, 'Invalid signature')
+        status_code, _, body = standin.handle('POST', '/g_business/v1/payments', headers, request.content)
+        assert (status_code, json.loads(body)['message']) == (400, 'Invalid flow or amount_unit')
+
+    @pytest.mark.asyncio
+    async def test_asgi_idempotency_and_errors(self, rsa_key, standin):
+        standin.error_rate = 0.5
+        retry = Retry(attempts=20, backoff=0.001, max_backoff=0.001)
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin', retry=retry) as client:
+            headers = {'Idempotency-Key': 'order-42'}
+            first = await client.create_payment(100, 'EUR', headers=dict(headers))
+            second = await client.create_payment(100, 'EUR', headers=dict(headers))
+            standin.error_rate = 1
+            failed = await client.get_payment_details(first.json()['id'])
+        assert first.json() == second.json()
+        assert len(standin) == 1
+        assert failed.status_code == 503
+
+    def test_wsgi(self, rsa_key, standin):
+        with SatispayClient('key_id', rsa_key, app=standin.wsgi, base_url='http://standin') as client:
+            payment_id = client.create_payment(100, 'EUR').json()['id']
+            assert client.get_payment_details(payment_id).json()['id'] == payment_id
+
+    @pytest.mark.asyncio
+    async def test_onboarding(self, tmp_path):
+        standin = StandInSatispay(tokens=['token'])
+        results = provision_merchants(
+            ['token', 'token', 'unknown'], tmp_path, key_size=1024, concurrency=1, app=standin, base_url='http://standin'
+        )
+        results = [result async for result in results]
+        assert [result.error is None for result in results] == [True, False, False]
+        assert results[1].error.response.status_code == 403
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from pytest import fixture
+
+from satispaython import AsyncSatispayClient, SatispayClient
+from satispaython.cache import PaymentCache
+from satispaython.models import ACCEPT, ACCEPTED, AUTHORIZED, CANCEL, CANCELED, PENDING
+from satispaython.standin import StandInSatispay
+from satispaython.sweeper import cancel_stale_payments, format_report
+from satispaython.utils import format_datetime
+
+
+@fixture()
+def standin(rsa_key):
+    standin = StandInSatispay(seed=0)
+    standin.register_key('key_id', rsa_key.public_key())
+    return standin
+
+
+class TestUpdatePayment:
+
+    def test_cancel(self, rsa_key, standin):
+        with SatispayClient('key_id', rsa_key, app=standin.wsgi, base_url='http://standin') as client:
+            payment_id = client.create_payment(100, 'EUR').json()['id']
+            response = client.update_payment(payment_id, CANCEL, {'metadata': {'reason': 'abandoned'}})
+            again = client.update_payment(payment_id, CANCEL)
+        assert response.status_code == 200
+        assert response.json()['status'] == CANCELED
+        assert standin.get_payment(payment_id)['metadata'] == {'reason': 'abandoned'}
+        assert again.status_code == 400
+
+    def test_refreshes_cache(self, rsa_key, standin):
+        cache = PaymentCache()
+        with SatispayClient('key_id', rsa_key, cache=cache, app=standin.wsgi, base_url='http://standin') as client:
+            payment_id = client.create_payment(100, 'EUR').json()['id']
+            standin.set_status(payment_id, AUTHORIZED)
+            assert client.get_payment_details(payment_id).json()['status'] == AUTHORIZED
+            client.update_payment(payment_id, ACCEPT)
+            assert client.get_payment_details(payment_id).json()['status'] == ACCEPTED
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_async(self, rsa_key, standin):
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin') as client:
+            payment_id = (await client.create_payment(100, 'EUR')).json()['id']
+            response = await client.update_payment(payment_id, ACCEPT)
+        assert response.status_code == 400
+        assert standin.get_payment(payment_id)['status'] == PENDING
+
+    def test_request(self, rsa_key):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={'id': 'payment_id', 'status': CANCELED})
+
+        with SatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            client.update_payment('payment_id', CANCEL, headers=httpx.Headers({'X-Request-Id': '1'}))
+        request = requests[0]
+        assert request.method == 'PUT'
+        assert request.url == 'https://authservices.satispay.com/g_business/v1/payments/payment_id'
+        assert request.headers['Content-Type'] == 'application/json'
+        assert request.headers['X-Request-Id'] == '1'
+        assert request.content == b'{"action": "CANCEL"}'
+
+
+def _any_payment(payment):
+    return True
+
+
+class TestCancelStalePayments:
+
+    @pytest.mark.asyncio
+    async def test_cancels_stale_pending_payments(self, rsa_key, standin):
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin') as client:
+            created = [(await client.create_payment(amount, 'EUR')).json()['id'] for amount in range(1, 8)]
+            standin.set_status(created[0], ACCEPTED)
+            report = await cancel_stale_payments(client, _any_payment, max_age=timedelta(0), concurrency=3, rate=None)
+        assert (report.scanned, report.stale, report.canceled, report.failed) == (6, 6, 6, 0)
+        assert [standin.get_payment(payment_id)['status'] for payment_id in created] == [ACCEPTED] + [CANCELED] * 6
+        assert 'canceled    6' in format_report(report)
+
+    @pytest.mark.asyncio
+    async def test_skips_recent_and_filtered_payments(self, rsa_key, standin):
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin') as client:
+            for amount in (1, 2, 3):
+                await client.create_payment(amount, 'EUR')
+            recent = await cancel_stale_payments(client, _any_payment)
+            filtered = await cancel_stale_payments(
+                client, lambda payment: payment.amount_unit > 1, max_age=timedelta(0)
+            )
+        assert (recent.scanned, recent.stale, recent.canceled) == (3, 0, 0)
+        assert (filtered.scanned, filtered.stale, filtered.canceled) == (3, 2, 2)
+
+    @pytest.mark.asyncio
+    async def test_dry_run(self, rsa_key, standin):
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin') as client:
+            payment_id = (await client.create_payment(100, 'EUR')).json()['id']
+            report = await cancel_stale_payments(client, _any_payment, max_age=timedelta(0), dry_run=True)
+        assert (report.stale, report.canceled) == (1, 0)
+        assert standin.get_payment(payment_id)['status'] == PENDING
+        assert 'dry run' in format_report(report)
+
+    @pytest.mark.asyncio
+    async def test_rate_and_errors(self, rsa_key, standin):
+        def fail_from_now_on(payment):
+            standin.error_rate = 1.0
+            return True
+
+        async with AsyncSatispayClient('key_id', rsa_key, app=standin, base_url='http://standin') as client:
+            for amount in range(1, 6):
+                await client.create_payment(amount, 'EUR')
+            started = asyncio.get_event_loop().time()
+            report = await cancel_stale_payments(client, fail_from_now_on, max_age=timedelta(0), rate=50)
+            elapsed = asyncio.get_event_loop().time() - started
+        assert (report.stale, report.canceled, report.failed) == (5, 0, 5)
+        assert report.errors == {'503': 5}
+        assert elapsed >= 0.08
+        assert 'failed      5 (503: 5)' in format_report(report)
+
+    @pytest.mark.asyncio
+    async def test_malformed_response(self, rsa_key):
+        inserted = format_datetime(datetime.now(timezone.utc) - timedelta(hours=2))
+
+        def handler(request):
+            if request.method == 'GET':
+                data = [{'id': payment_id, 'status': PENDING, 'insert_date': inserted} for payment_id in 'abc']
+                return httpx.Response(200, json={'has_more': False, 'data': data})
+            payment_id = request.url.path.rsplit('/', 1)[-1]
+            if payment_id == 'b':
+                return httpx.Response(200, content=b'<html>')
+            return httpx.Response(200, json={'id': payment_id, 'status': CANCELED})
+
+        async with AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler)) as client:
+            report = await cancel_stale_payments(client, lambda payment: True, rate=None)
+        assert (report.scanned, report.stale, report.canceled, report.failed) == (3, 3, 2, 1)
+        assert list(report.errors) == ['JSONDecodeError']
@@ -1,8 +1,12 @@
 from datetime import datetime
 
+import threading
+
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
 from pytest import fixture, raises
 
+from satispaython.utils import KeyStore, keystore
 from satispaython.utils.utils import format_datetime, generate_key, load_key, write_key
 
 
@@ -95,3 +99,77 @@ class TestKeyUtils:
             write_key(rsa_key, key_path, 'password')
             with raises(ValueError):
                 load_key(key_path, 'wrong_password')
+
+
+class TestKeyStore:
+
+    def test_key_is_loaded_once(self, rsa_key, key_path):
+        write_key(rsa_key, key_path, 'password')
+        store = KeyStore()
+        first = store.get(key_path, 'password')
+        assert first.private_numbers() == rsa_key.private_numbers()
+        assert store.get(str(key_path), 'password') is first
+        assert len(store) == 1
+
+    def test_reload_on_change(self, rsa_key, key_path):
+        reloads = []
+        write_key(rsa_key, key_path)
+        store = KeyStore(check_interval=0, on_reload=lambda *args: reloads.append(args))
+        first = store.get(key_path)
+        assert store.get(key_path) is first
+        new_key = generate_private_key(65537, 2048)
+        write_key(new_key, key_path)
+        second = store.get(key_path)
+        assert second.private_numbers() == new_key.private_numbers()
+        assert reloads == [(str(key_path), first, second)]
+
+    def test_reload_on_replace(self, rsa_key, key_path, tmp_path):
+        write_key(rsa_key, key_path)
+        store = KeyStore(check_interval=0)
+        store.get(key_path)
+        new_key = generate_private_key(65537, 2048)
+        write_key(new_key, tmp_path / 'new.pem')
+        (tmp_path / 'new.pem').replace(key_path)
+        assert store.get(key_path).private_numbers() == new_key.private_numbers()
+
+    def test_refresh_does_not_overwrite_a_reload(self, rsa_key, key_path, monkeypatch):
+        reloads = []
+        write_key(rsa_key, key_path)
+        store = KeyStore(check_interval=0, on_reload=lambda *args: reloads.append(args))
+        first = store.get(key_path)
+        new_key = generate_private_key(65537, 2048)
+        file_signature = keystore._file_signature
+
+        def rotate_after_stat(path):
+            signature = file_signature(path)
+            monkeypatch.setattr(keystore, '_file_signature', file_signature)
+            write_key(new_key, key_path)
+            store.get(key_path)
+            return signature
+
+        monkeypatch.setattr(keystore, '_file_signature', rotate_after_stat)
+        assert store.get(key_path).private_numbers() == new_key.private_numbers()
+        assert store.get(key_path).private_numbers() == new_key.private_numbers()
+        assert len(reloads) == 1
+        assert reloads[0][1] is first
+
+    def test_check_interval(self, rsa_key, key_path):
+        write_key(rsa_key, key_path)
+        store = KeyStore(check_interval=3600)
+        first = store.get(key_path)
+        write_key(generate_private_key(65537, 2048), key_path)
+        assert store.get(key_path) is first
+        store.invalidate(key_path)
+        assert store.get(key_path) is not first
+
+    def test_concurrent_reads(self, rsa_key, key_path):
+        write_key(rsa_key, key_path, 'password')
+        store = KeyStore(check_interval=0)
+        keys = []
+        threads = [threading.Thread(target=lambda: keys.append(store.get(key_path, 'password'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(keys) == 8
+        assert all(key is keys[0] for key in keys)
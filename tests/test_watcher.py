@@ -0,0 +1,111 @@
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+from pytest import fixture
+
+from satispaython import AsyncSatispayClient
+from satispaython.watcher import PaymentWatcher
+
+
+class _Handler:
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.calls = Counter()
+
+    def __call__(self, request):
+        payment_id = request.url.path.rsplit('/', 1)[-1]
+        self.calls[payment_id] += 1
+        statuses = self.statuses[payment_id]
+        status = statuses[min(self.calls[payment_id], len(statuses)) - 1]
+        if status is None:
+            return httpx.Response(500)
+        if isinstance(status, dict):
+            return httpx.Response(200, json={'id': payment_id, **status})
+        return httpx.Response(200, json={'id': payment_id, 'status': status})
+
+
+@fixture()
+def handler():
+    return _Handler({
+        'accepted': ['PENDING', None, 'PENDING', 'ACCEPTED'],
+        'canceled': ['CANCELED'],
+        'pending': ['PENDING'],
+        'expired': ['PENDING', {'status': 'PENDING', 'expired': True}],
+    })
+
+
+@fixture()
+def client(rsa_key, handler):
+    return AsyncSatispayClient('key_id', rsa_key, transport=httpx.MockTransport(handler))
+
+
+class TestPaymentWatcher:
+
+    @pytest.mark.asyncio
+    async def test_terminal_states(self, client, handler):
+        changes = []
+        async with client, PaymentWatcher(client, min_interval=0.01, on_change=lambda *args: changes.append(args)) \
+                as watcher:
+            accepted, canceled = watcher.watch('accepted'), watcher.watch('canceled')
+            assert await asyncio.wait_for(accepted, 1) == {'id': 'accepted', 'status': 'ACCEPTED'}
+            assert await asyncio.wait_for(canceled, 1) == {'id': 'canceled', 'status': 'CANCELED'}
+            assert len(watcher) == 0
+        assert handler.calls == {'accepted': 4, 'canceled': 1}
+        assert sorted(changes, key=lambda change: (change[0], change[1]['status'])) == [
+            ('accepted', {'id': 'accepted', 'status': 'ACCEPTED'}),
+            ('accepted', {'id': 'accepted', 'status': 'PENDING'}),
+            ('canceled', {'id': 'canceled', 'status': 'CANCELED'}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_expired_payment_stops_polling(self, client, handler):
+        async with client, PaymentWatcher(client, min_interval=0.01) as watcher:
+            payment = await asyncio.wait_for(watcher.watch('expired'), 1)
+            await asyncio.sleep(0.05)
+        assert payment == {'id': 'expired', 'status': 'PENDING', 'expired': True}
+        assert handler.calls['expired'] == 2
+
+    @pytest.mark.asyncio
+    async def test_callback_coroutine(self, client):
+        changes = []
+
+        async def callback(payment_id, payment):
+            changes.append(payment['status'])
+
+        async with client, PaymentWatcher(client, min_interval=0.01) as watcher:
+            await asyncio.wait_for(watcher.watch('accepted', callback), 1)
+        assert changes == ['PENDING', 'ACCEPTED']
+
+    @pytest.mark.asyncio
+    async def test_same_payment_is_watched_once(self, client):
+        async with client, PaymentWatcher(client) as watcher:
+            assert watcher.watch('canceled') is watcher.watch('canceled')
+            assert len(watcher) == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, client, handler):
+        async with client, PaymentWatcher(client, min_interval=0.01, timeout=0.05) as watcher:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(watcher.watch('pending'), 1)
+        assert 1 < handler.calls['pending'] <= 7
+
+    @pytest.mark.asyncio
+    async def test_adaptive_backoff(self, client, handler):
+        async with client, PaymentWatcher(client, min_interval=0.01, max_interval=0.2, backoff=1.0) as watcher:
+            watcher.watch('pending')
+            await asyncio.sleep(0.3)
+        assert handler.calls['pending'] < 10
+
+    @pytest.mark.asyncio
+    async def test_unwatch(self, client, handler):
+        async with client, PaymentWatcher(client, min_interval=0.01) as watcher:
+            future = watcher.watch('pending')
+            await asyncio.sleep(0.05)
+            watcher.unwatch('pending')
+            calls = handler.calls['pending']
+            await asyncio.sleep(0.05)
+        assert future.cancelled()
+        assert handler.calls['pending'] <= calls + 1